@@ -1,8 +1,18 @@
 import importlib
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.connection import wait
+from dataclasses import dataclass, field
+import hashlib
+import random
 import time
 
 from models.DotsBoxModel import DotsBoxModel
+from models.bitboard import BoardGeometry, BoardView, get_geometry
+from profiling import BattleHook
+from remote import MoveTimeout, RemoteModel
+from results import EncodedResult, ResultStore, ResultWriter, encode_result
+from stats import mean_and_stderr, sprt_bounds, sprt_llr
 
 
 @dataclass
@@ -10,14 +20,121 @@ class BattleResult:
     winner: int
     actions: list[tuple[int, tuple[int, int, int]]]
     time_taken: list[tuple[int, float]]
+    # 0: finished, 1: invalid move, 2: move deadline missed (`remote.MoveTimeout`);
+    # on 1 and 2 the player to move forfeits
     flag: int = 0
+    seed: int | None = None
+    score: tuple[int, int] = (0, 0)
+    # (player, the model's `stats` for that move), parallel to `time_taken`
+    move_stats: list[tuple[int, dict[str, int | str]]] = field(default_factory=list)
+
+
+@dataclass
+class SprtResult:
+    """Outcome of `Battle.sprt`; wins/draws/losses are player 1's."""
+
+    decision: str | None  # "H1", "H0", or None if max_games ran out
+    llr: float
+    bounds: tuple[float, float]
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    results: list[list[BattleResult]] = field(default_factory=lambda: [[], []])
+
+
+@dataclass
+class PairedResult:
+    """Outcome of `Battle.paired`, from player 1's point of view.
+
+    `diff` is player 1's points minus player 2's over both games of an
+    opening (win 1, draw 1/2), `margin` the same for boxes.
+    """
+
+    openings: list[list[list[int]]]
+    pairs: list[tuple[BattleResult, BattleResult]]
+    mean_diff: float
+    diff_stderr: float
+    mean_margin: float
+    margin_stderr: float
+
+
+def derive_seed(seed: int, *keys: int | str) -> int:
+    """Stable 64-bit seed for one game of a seeded batch."""
+    digest = hashlib.sha256(repr((seed, *keys)).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+# each pool worker keeps its own unpickled copy of the Battle (and its players)
+_worker_battle: "Battle | None" = None
+
+
+def _init_worker(battle: "Battle") -> None:
+    global _worker_battle
+    _worker_battle = battle
+
+
+def _play_game(task: tuple) -> "BattleResult":
+    # task: Battle.battle arguments, (initial_turn, seed[, opening])
+    assert _worker_battle is not None
+    return _worker_battle.battle(*task)
+
+
+def _play_game_encoded(task: tuple) -> EncodedResult:
+    assert _worker_battle is not None
+    result = _worker_battle.battle(*task)
+    return encode_result(result, task[0], _worker_battle.geo)
+
+
+def random_opening(
+    geo: BoardGeometry, n_moves: int, rng: random.Random
+) -> list[list[int]]:
+    """Up to `n_moves` random safe moves from the empty board.
+
+    Safe moves never complete a box, so the turn alternates through the
+    whole prefix.
+    """
+    bits = 0
+    opening = []
+    for _ in range(n_moves):
+        _, safe, _ = geo.classify(bits)
+        if not safe:
+            break
+        edge = rng.choice(safe)
+        bits |= 1 << edge
+        opening.append(geo.move_of(edge))
+    return opening
 
 
 class Battle:
-    def __init__(self, player1: DotsBoxModel, player2: DotsBoxModel):
+    def __init__(
+        self,
+        player1: DotsBoxModel,
+        player2: DotsBoxModel,
+        hooks: list[BattleHook] | None = None,
+        ponder: tuple[bool, bool] | None = None,
+        board_view: bool = True,
+    ):
         self.turn = 0
 
         self.players = [player1, player2]
+        # called around every model call, e.g. `profiling.ModelProfiler`
+        self.hooks = list(hooks or [])
+        # per-player pondering on/off (`DotsBoxModel.PONDER`); None keeps the
+        # models' own setting. Only `RemoteModel`s ponder: in this process
+        # the pondering thread would share the GIL with the other player
+        # and be charged to its `time_taken`.
+        if ponder is not None:
+            for player, on in zip(self.players, ponder):
+                player.PONDER = on
+        for player in self.players:
+            if player.PONDER and not isinstance(player, RemoteModel):
+                raise ValueError(
+                    f"{player.__class__.__name__} would ponder in the referee's "
+                    "process; wrap it in a RemoteModel"
+                )
+        # models get a read-only `BoardView` of the board instead of the
+        # referee's own nested list (`on_move` is called either way)
+        self.board_view = board_view
 
         self.xsize = 5
         self.ysize = 5
@@ -28,30 +145,39 @@ class Battle:
             [[0 for _ in [0, 1]] for _ in range((self.ysize))]
             for _ in range(self.xsize)
         ]
+        self.geo = get_geometry(self.xsize, self.ysize)
+        self.bits = 0
         self.BATCH_SIZE = 80
 
-    def start(self):
-        print(
-            f"Battle started: {self.players[0].__class__.__name__} vs {self.players[1].__class__.__name__}!"
-        )
-
-        self.turn = 0
+    def reset(self, initial_turn: int) -> None:
+        self.turn = initial_turn
         self.board = [
             [[0 for _ in [0, 1]] for _ in range((self.ysize + 1))]
             for _ in range(self.xsize + 1)
         ]
+        self.bits = 0
 
         self.score = [0, 0]
 
+    def start(self):
+        print(
+            f"Battle started: {self.players[0].__class__.__name__} vs {self.players[1].__class__.__name__}!"
+        )
+
+        self.reset(0)
+        for i, player in enumerate(self.players):
+            player.on_game_start(i, self.xsize, self.ysize)
+
         while self.is_over() is False:
             current_player = self.players[self.turn]
             print(f"Player {self.turn}'s turn ({current_player.__class__.__name__})")
 
-            move = current_player.run(self.board, self.xsize, self.ysize)
+            move = current_player.run(self.view(), self.xsize, self.ysize)
 
             completed_boxes = self.try_move(move)
 
             if completed_boxes == -1:
+                self._stop_pondering()
                 print(
                     f"Invalid move by Player {self.turn}: {move}. They forfeit the game."
                 )
@@ -59,6 +185,7 @@ class Battle:
                 print(f"Player {winner} wins!")
                 return
 
+            self._notify(move, completed_boxes)
             self.score[self.turn] += completed_boxes
 
             print(
@@ -71,110 +198,527 @@ class Battle:
             if completed_boxes == 0:
                 self.turn = 1 - self.turn
 
-    def battle(self, initial_turn: int) -> BattleResult:
+        self._stop_pondering()
+
+    def battle(
+        self,
+        initial_turn: int,
+        seed: int | None = None,
+        opening: list[list[int]] | None = None,
+    ) -> BattleResult:
+        # seed the global `random` the models draw from
+        if seed is not None:
+            random.seed(seed)
+            self._reseed_workers(seed)
+
         # clear state
-        self.turn = initial_turn
-        self.board = [
-            [[0 for _ in [0, 1]] for _ in range((self.ysize + 1))]
-            for _ in range(self.xsize + 1)
-        ]
+        self.reset(initial_turn)
+        for i, player in enumerate(self.players):
+            player.on_game_start(i, self.xsize, self.ysize)
 
-        self.score = [0, 0]
+        # forced opening moves, played for the models (not in `actions`)
+        for move in opening or []:
+            completed_boxes = self.try_move(move)
+            if completed_boxes == -1:
+                raise ValueError(f"Invalid opening move: {move}")
+            self._notify(move, completed_boxes)
+            self.score[self.turn] += completed_boxes
+            if completed_boxes == 0:
+                self.turn = 1 - self.turn
 
         # record time taken and moves turn
 
         time_taken = []
         actions = []
+        move_stats = []
 
         # battle loop
         while self.is_over() is False:
             current_player = self.players[self.turn]
 
-            delta_t = time.time()
-            move = current_player.run(self.board, self.xsize, self.ysize)
-            delta_t = time.time() - delta_t
-            completed_boxes = self.try_move(move)
+            for hook in self.hooks:
+                hook.before_move(self.turn, current_player)
+            board = self.view()
+            delta_t = time.perf_counter_ns()
+            try:
+                move = current_player.run(board, self.xsize, self.ysize)
+            except MoveTimeout:
+                move = None
+            delta_t = (time.perf_counter_ns() - delta_t) / 1e9
+            if isinstance(current_player, RemoteModel) and move is not None:
+                delta_t = current_player.seconds  # timed inside the worker
+            for hook in self.hooks:
+                hook.after_move(self.turn, current_player, delta_t)
+            completed_boxes = -1 if move is None else self.try_move(move)
 
             if completed_boxes == -1:
+                self._stop_pondering()
                 winner = 1 - self.turn
                 return BattleResult(
-                    winner=winner, actions=actions, time_taken=time_taken, flag=1
+                    winner=winner,
+                    actions=actions,
+                    time_taken=time_taken,
+                    flag=1 if move is not None else 2,
+                    seed=seed,
+                    score=(self.score[0], self.score[1]),
+                    move_stats=move_stats,
                 )
 
+            self._notify(move, completed_boxes)
             self.score[self.turn] += completed_boxes
 
             actions.append((self.turn, move))
             time_taken.append((self.turn, delta_t))
+            move_stats.append((self.turn, dict(current_player.stats)))
 
             if completed_boxes == 0:
                 self.turn = 1 - self.turn
 
-        if self.score[0] > self.score[1]:
-            return BattleResult(winner=0, actions=actions, time_taken=time_taken)
-        elif self.score[1] > self.score[0]:
-            return BattleResult(winner=1, actions=actions, time_taken=time_taken)
-        else:
-            return BattleResult(winner=-1, actions=actions, time_taken=time_taken)
+        self._stop_pondering()
+        return BattleResult(
+            winner=self.winner(),
+            actions=actions,
+            time_taken=time_taken,
+            seed=seed,
+            score=(self.score[0], self.score[1]),
+            move_stats=move_stats,
+        )
 
-    def batch(self) -> list[list[BattleResult]]:
+    def batch(
+        self, workers: int = 1, seed: int | None = None
+    ) -> list[list[BattleResult]]:
+        """Play `BATCH_SIZE` games per starting side.
+
+        With `seed`, every game gets its own seed derived from `(seed, side,
+        index)`. `workers > 1` spreads the games over a process pool; the
+        players are pickled into each worker, so each worker plays a
+        different subset of games with the same model objects. Results
+        therefore only match across `workers` when the models forget
+        earlier games in `on_game_start` (V4b and NimberH do) and don't
+        play by the clock (`time_limit`, pondering). The `[side][index]`
+        result layout is the same either way.
+        """
+        tasks = self._tasks(workers, seed)
+
+        if workers <= 1:
+            results = [self.battle(initial_turn, s) for initial_turn, s in tasks]
+        else:
+            with self._pool(workers) as pool:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                results = list(pool.map(_play_game, tasks, chunksize=chunksize))
 
         battle_results = [
-            [self.battle(_initial_turn) for _ in range(self.BATCH_SIZE)]
-            for _initial_turn in [0, 1]
+            results[: self.BATCH_SIZE],
+            results[self.BATCH_SIZE :],
         ]
 
         return battle_results
 
+    def _tasks(
+        self, workers: int, seed: int | None
+    ) -> list[tuple[int, int | None]]:
+        """`(initial_turn, game seed)` for every game of a batch, side 0 first."""
+        if seed is None and workers > 1:
+            # forked workers would otherwise share one `random` state
+            seed = random.getrandbits(64)
+
+        return [
+            (_initial_turn, None if seed is None else derive_seed(seed, _initial_turn, i))
+            for _initial_turn in [0, 1]
+            for i in range(self.BATCH_SIZE)
+        ]
+
+    def batch_to_disk(
+        self,
+        path: str,
+        workers: int = 1,
+        seed: int | None = None,
+        chunk_games: int = 1024,
+    ) -> ResultStore:
+        """`batch()`, streamed into a `results.ResultWriter` directory.
+
+        Games are written as they finish (in batch order) instead of being
+        kept in memory; workers send back compact column arrays. Returns a
+        memory-mapped `ResultStore` over everything in `path`.
+        """
+        tasks = self._tasks(workers, seed)
+        with ResultWriter(path, self.xsize, self.ysize, chunk_games) as writer:
+            if workers <= 1:
+                for initial_turn, s in tasks:
+                    writer.add(self.battle(initial_turn, s), initial_turn)
+            else:
+                with self._pool(workers) as pool:
+                    chunksize = max(1, len(tasks) // (workers * 4))
+                    for encoded in pool.map(
+                        _play_game_encoded, tasks, chunksize=chunksize
+                    ):
+                        writer.add_encoded(encoded)
+        return ResultStore(path)
+
+    def sprt(
+        self,
+        elo0: float = 0.0,
+        elo1: float = 10.0,
+        alpha: float = 0.05,
+        beta: float = 0.05,
+        workers: int = 1,
+        seed: int | None = None,
+        max_games: int = 20000,
+    ) -> SprtResult:
+        """Play games until a sequential probability ratio test decides.
+
+        H0: player 1 is `elo0` stronger than player 2, H1: `elo1` stronger.
+        Games alternate starting sides and are checked strictly in order,
+        so with a `seed` the stopping point (and every game played) does
+        not depend on `workers`; extra games in flight are discarded.
+        Game `k` uses the seed `batch()` gives side `k % 2`, index `k // 2`.
+        """
+        if seed is None and workers > 1:
+            seed = random.getrandbits(64)
+
+        def task(k: int) -> tuple[int, int | None]:
+            initial_turn = k % 2
+            return (
+                initial_turn,
+                None if seed is None else derive_seed(seed, initial_turn, k // 2),
+            )
+
+        lower, upper = sprt_bounds(alpha, beta)
+        outcome = SprtResult(decision=None, llr=0.0, bounds=(lower, upper))
+
+        def record(initial_turn: int, result: BattleResult) -> bool:
+            outcome.results[initial_turn].append(result)
+            if result.winner == 0:
+                outcome.wins += 1
+            elif result.winner == 1:
+                outcome.losses += 1
+            else:
+                outcome.draws += 1
+            outcome.llr = sprt_llr(
+                outcome.wins, outcome.draws, outcome.losses, elo0, elo1
+            )
+            if outcome.llr >= upper:
+                outcome.decision = "H1"
+            elif outcome.llr <= lower:
+                outcome.decision = "H0"
+            return outcome.decision is not None
+
+        if workers <= 1:
+            for k in range(max_games):
+                initial_turn, s = task(k)
+                if record(initial_turn, self.battle(initial_turn, s)):
+                    break
+            return outcome
+
+        with self._pool(workers) as pool:
+            pending: deque[tuple[int, Future]] = deque()
+            k = 0
+            while k < max_games or pending:
+                while k < max_games and len(pending) < workers * 2:
+                    t = task(k)
+                    pending.append((t[0], pool.submit(_play_game, t)))
+                    k += 1
+                initial_turn, future = pending.popleft()
+                if record(initial_turn, future.result()):
+                    break
+            for _, future in pending:
+                future.cancel()
+        return outcome
+
+    def paired(
+        self,
+        n_openings: int,
+        opening_moves: int = 10,
+        workers: int = 1,
+        seed: int | None = None,
+    ) -> PairedResult:
+        """Play each of `n_openings` random openings twice, sides swapped.
+
+        An opening is a seeded prefix of `opening_moves` safe moves
+        (`random_opening`). Both games of a pair also share the models'
+        `random` seed, so the pair differs only in who plays which side;
+        the per-pair differences then have far less variance than
+        independent games.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+
+        openings = [
+            random_opening(
+                self.geo, opening_moves, random.Random(derive_seed(seed, "opening", i))
+            )
+            for i in range(n_openings)
+        ]
+        tasks = [
+            (_initial_turn, derive_seed(seed, "game", i), opening)
+            for i, opening in enumerate(openings)
+            for _initial_turn in [0, 1]
+        ]
+
+        if workers <= 1:
+            results = [self.battle(*task) for task in tasks]
+        else:
+            with self._pool(workers) as pool:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                results = list(pool.map(_play_game, tasks, chunksize=chunksize))
+
+        pairs = list(zip(results[0::2], results[1::2]))
+        points = {0: 1.0, 1: 0.0, -1: 0.5}
+        diffs = [
+            2 * (points[a.winner] + points[b.winner]) - 2 for a, b in pairs
+        ]
+        margins = [
+            (a.score[0] - a.score[1]) + (b.score[0] - b.score[1]) for a, b in pairs
+        ]
+        mean_diff, diff_stderr = mean_and_stderr(diffs)
+        mean_margin, margin_stderr = mean_and_stderr(margins)
+        return PairedResult(
+            openings=openings,
+            pairs=pairs,
+            mean_diff=mean_diff,
+            diff_stderr=diff_stderr,
+            mean_margin=mean_margin,
+            margin_stderr=margin_stderr,
+        )
+
+    def batch_interleaved(self, seed: int | None = None) -> list[list[BattleResult]]:
+        """Play `2 * BATCH_SIZE` games like `batch()`'s (same sides and
+        count), all at once. They are equivalent, not identical, games.
+
+        Every round, each player gets all of its pending positions in a
+        single `run_batch()` call, so models can amortize work across games.
+        A move's `time_taken` is its share of that call, and `move_stats`
+        stay empty since one call covers many moves. The models' global
+        `random` is seeded once with `seed`, not per game. `on_move` isn't
+        called, since each model follows many games at once.
+        """
+        if seed is not None:
+            random.seed(seed)
+
+        games: list[Battle] = []
+        for _initial_turn in [0, 1]:
+            for _ in range(self.BATCH_SIZE):
+                game = Battle(*self.players, board_view=self.board_view)
+                game.xsize, game.ysize = self.xsize, self.ysize
+                game.geo = self.geo
+                game.reset(_initial_turn)
+                games.append(game)
+        actions: list[list[tuple[int, list[int]]]] = [[] for _ in games]
+        time_taken: list[list[tuple[int, float]]] = [[] for _ in games]
+        results: list[BattleResult | None] = [None] * len(games)
+
+        while any(r is None for r in results):
+            for turn in [0, 1]:
+                pending = [
+                    i
+                    for i, game in enumerate(games)
+                    if results[i] is None and game.turn == turn
+                ]
+                if not pending:
+                    continue
+
+                for hook in self.hooks:
+                    hook.before_move(turn, self.players[turn])
+                delta_t = time.perf_counter_ns()
+                moves = self.players[turn].run_batch(
+                    [games[i].view() for i in pending], self.xsize, self.ysize
+                )
+                delta_t = (time.perf_counter_ns() - delta_t) / 1e9
+                for hook in self.hooks:
+                    hook.after_move(turn, self.players[turn], delta_t)
+                delta_t /= len(pending)
+
+                for i, move in zip(pending, moves):
+                    game = games[i]
+                    completed_boxes = game.try_move(move)
+                    if completed_boxes == -1:
+                        results[i] = BattleResult(
+                            winner=1 - turn,
+                            actions=actions[i],
+                            time_taken=time_taken[i],
+                            flag=1,
+                            seed=seed,
+                            score=(game.score[0], game.score[1]),
+                        )
+                        continue
+
+                    game.score[turn] += completed_boxes
+                    actions[i].append((turn, move))
+                    time_taken[i].append((turn, delta_t))
+
+                    if completed_boxes == 0:
+                        game.turn = 1 - turn
+                    if game.is_over():
+                        results[i] = BattleResult(
+                            winner=game.winner(),
+                            actions=actions[i],
+                            time_taken=time_taken[i],
+                            seed=seed,
+                            score=(game.score[0], game.score[1]),
+                        )
+
+        return [
+            results[: self.BATCH_SIZE],  # type: ignore[list-item]
+            results[self.BATCH_SIZE :],  # type: ignore[list-item]
+        ]
+
+    def batch_pipelined(self, seed: int | None = None) -> list[list[BattleResult]]:
+        """Play `2 * BATCH_SIZE` games like `batch()`'s, all at once, with
+        both players in worker processes (`remote.RemoteModel`). They are
+        equivalent, not identical, games.
+
+        Each worker always has a move in flight, from the game that has
+        waited on it longest, so the two players compute at the same time
+        on different games. Times are measured inside the workers and a
+        missed deadline forfeits that game (`flag` 2). As in
+        `batch_interleaved`, each model follows many games at once, so
+        `on_move` isn't called, and the workers' `random` is seeded once.
+        """
+        players = self.players
+        if not all(isinstance(p, RemoteModel) for p in players):
+            raise TypeError("batch_pipelined needs RemoteModel players")
+        remotes: list[RemoteModel] = players  # type: ignore[assignment]
+        if seed is not None:
+            self._reseed_workers(seed)
+
+        games: list[Battle] = []
+        for _initial_turn in [0, 1]:
+            for _ in range(self.BATCH_SIZE):
+                game = Battle(*self.players, board_view=True)
+                game.xsize, game.ysize = self.xsize, self.ysize
+                game.geo = self.geo
+                game.reset(_initial_turn)
+                games.append(game)
+        actions: list[list[tuple[int, list[int]]]] = [[] for _ in games]
+        time_taken: list[list[tuple[int, float]]] = [[] for _ in games]
+        move_stats: list[list[tuple[int, dict]]] = [[] for _ in games]
+        results: list[BattleResult | None] = [None] * len(games)
+
+        def finish(i: int, winner: int, flag: int = 0) -> None:
+            game = games[i]
+            results[i] = BattleResult(
+                winner=winner,
+                actions=actions[i],
+                time_taken=time_taken[i],
+                flag=flag,
+                seed=seed,
+                score=(game.score[0], game.score[1]),
+                move_stats=move_stats[i],
+            )
+
+        # games waiting on each player, and the game each worker is on
+        queues = [deque(i for i, g in enumerate(games) if g.turn == t) for t in [0, 1]]
+        busy: list[int | None] = [None, None]
+        while any(r is None for r in results):
+            for turn in [0, 1]:
+                if busy[turn] is None and queues[turn]:
+                    i = queues[turn].popleft()
+                    remotes[turn].submit(games[i].view(), self.xsize, self.ysize)
+                    busy[turn] = i
+
+            working = [turn for turn in [0, 1] if busy[turn] is not None]
+            left = [remotes[turn].remaining() for turn in working]
+            timeout = None if None in left else min(left)  # type: ignore[type-var]
+            ready = wait([remotes[turn].conn for turn in working], timeout)
+
+            for turn in working:
+                remote = remotes[turn]
+                if remote.conn not in ready and remote.remaining() != 0.0:
+                    continue
+                i = busy[turn]
+                assert i is not None
+                busy[turn] = None
+                game = games[i]
+                try:
+                    move = remote.collect()
+                except MoveTimeout:
+                    finish(i, 1 - turn, flag=2)
+                    continue
+                completed_boxes = game.try_move(move)
+                if completed_boxes == -1:
+                    finish(i, 1 - turn, flag=1)
+                    continue
+
+                game.score[turn] += completed_boxes
+                actions[i].append((turn, move))
+                time_taken[i].append((turn, remote.seconds))
+                move_stats[i].append((turn, dict(remote.stats)))
+                if completed_boxes == 0:
+                    game.turn = 1 - turn
+                if game.is_over():
+                    finish(i, game.winner())
+                else:
+                    queues[game.turn].append(i)
+
+        return [
+            results[: self.BATCH_SIZE],  # type: ignore[list-item]
+            results[self.BATCH_SIZE :],  # type: ignore[list-item]
+        ]
+
+    def _pool(self, workers: int) -> ProcessPoolExecutor:
+        """A process pool whose workers each play on a copy of this Battle."""
+        if self.hooks:
+            # they'd run on the workers' copies and report nothing back
+            raise ValueError("Battle hooks need workers=1")
+        return ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self,)
+        )
+
+    def _reseed_workers(self, seed: int) -> None:
+        # worker processes don't share the referee's `random`
+        for i, player in enumerate(self.players):
+            if isinstance(player, RemoteModel):
+                player.reseed(derive_seed(seed, "player", i))
+
+    def view(self) -> "list[list[list[int]]] | BoardView":
+        """The board as the models get it (see `board_view`)."""
+        if self.board_view:
+            return BoardView(self.geo, self.bits)
+        return self.board
+
+    def _notify(self, move: list[int], completed_boxes: int) -> None:
+        for player in self.players:
+            player.on_move(self.turn, move, completed_boxes)
+
+    def _stop_pondering(self) -> None:
+        # a finished game's pondering must not run into the next game
+        for player in self.players:
+            player.stop_pondering()
+
+    def winner(self) -> int:
+        if self.score[0] > self.score[1]:
+            return 0
+        elif self.score[1] > self.score[0]:
+            return 1
+        else:
+            return -1
+
     def is_over(self) -> bool:
         total_boxes = self.xsize * self.ysize
         return self.score[0] + self.score[1] >= total_boxes
 
     def is_move_valid(self, move: list[int]):
-        x, y, z = move
-        if 0 <= x <= self.xsize and 0 <= y <= self.ysize and z in [0, 1]:
-            if x == self.xsize and z == 0:
-                return False
-            if y == self.ysize and z == 1:
-                return False
-            if self.board[x][y][z] != 0:
-                return False
-            return True
-        else:
-            return False
+        edge = self.geo.edge_of(move)
+        return edge >= 0 and not self.bits >> edge & 1
 
     def _count_box_sides(self, x: int, y: int) -> int:
-        return (
-            self.board[x][y][0]
-            + self.board[x][y + 1][0]
-            + self.board[x][y][1]
-            + self.board[x + 1][y][1]
-        )
+        return self.geo.box_sides(self.bits, x * self.ysize + y)
 
     def _completed_boxes_count(self, move: list[int]) -> int:
-        x, y, z = move
-        completed = 0
-        if z == 0:
-            if y > 0 and self._count_box_sides(x, y - 1) == 3:
-                completed += 1
-            if y < self.ysize and self._count_box_sides(x, y) == 3:
-                completed += 1
-        else:
-            if x > 0 and self._count_box_sides(x - 1, y) == 3:
-                completed += 1
-            if x < self.xsize and self._count_box_sides(x, y) == 3:
-                completed += 1
-        return completed
+        return self.geo.completed_by(self.bits, self.geo.edge_of(move))
 
     def try_move(
         self, move: list[int]
     ) -> int:  # returns -1 if invalid, else completed boxes
-        if not self.is_move_valid(move):
+        edge = self.geo.edge_of(move)
+        if edge < 0 or self.bits >> edge & 1:
             return -1
 
         x, y, z = move
 
-        completed_boxes = self._completed_boxes_count(move)
+        completed_boxes = self.geo.completed_by(self.bits, edge)
 
+        self.bits |= 1 << edge
         self.board[x][y][z] = 1
 
         return completed_boxes
@@ -0,0 +1,202 @@
+#! /usr/bin/env python
+import argparse
+import gc
+import json
+import os.path
+import random
+import statistics
+import sys
+import time
+
+from models.bitboard import get_geometry
+from tournament import Entry, discover
+
+POSITIONS = "./data/bench/positions.json"
+BASELINE = "./data/bench/baseline.json"
+
+
+def load_positions(path: str = POSITIONS) -> tuple[int, int, list[dict]]:
+    """(xsize, ysize, positions); each position has a `name`, a `phase`
+    and its packed board `bits` (hex, see `models.bitboard`)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["xsize"], data["ysize"], data["positions"]
+
+
+def bench_entry(
+    entry: Entry,
+    xsize: int,
+    ysize: int,
+    positions: list[dict],
+    repeat: int,
+) -> dict[str, dict]:
+    """Time `entry`'s `run()` on every position.
+
+    Each run gets a freshly built model (no transposition table or
+    tracker carried over) and `random.seed(0)`, so the chosen move is
+    reproducible. One untimed run first warms up caches shared between
+    runs (geometry, opening book), so the first entry isn't timed cold.
+    Returns `{position name: {"move", "nodes", "median", "min"}}` with
+    times in seconds.
+    """
+    geo = get_geometry(xsize, ysize)
+    warmup = entry.build()
+    warmup.init()
+    warmup.run(geo.unpack(int(positions[0]["bits"], 16)), xsize, ysize)
+    report = {}
+    for position in positions:
+        board = geo.unpack(int(position["bits"], 16))
+        times = []
+        for _ in range(repeat):
+            model = entry.build()
+            model.init()
+            random.seed(0)
+            # earlier runs' garbage mustn't be collected on this run's clock
+            gc.collect()
+            t0 = time.perf_counter_ns()
+            move = model.run(board, xsize, ysize)
+            times.append((time.perf_counter_ns() - t0) / 1e9)
+        report[position["name"]] = {
+            "move": list(move),
+            "nodes": model.stats.get("nodes", 0),
+            "median": statistics.median(times),
+            "min": min(times),
+        }
+    return report
+
+
+def slower(now: dict, before: dict, tolerance: float, floor: float) -> bool:
+    """Whether the fastest run in `now` is slower than the one in `before`
+    by more than `tolerance` and by more than `floor` seconds."""
+    return (
+        now["min"] > before["min"] * (1.0 + tolerance)
+        and now["min"] - before["min"] > floor
+    )
+
+
+def retime(
+    entry: Entry,
+    xsize: int,
+    ysize: int,
+    positions: list[dict],
+    repeat: int,
+    report: dict[str, dict],
+) -> None:
+    """Time `positions` again and keep each one's fastest run in `report`."""
+    for position, again in bench_entry(entry, xsize, ysize, positions, repeat).items():
+        report[position]["min"] = min(report[position]["min"], again["min"])
+
+
+def compare(
+    results: dict[str, dict[str, dict]],
+    baseline: dict[str, dict[str, dict]],
+    tolerance: float,
+    floor: float,
+) -> list[str]:
+    """Regressions of `results` against `baseline`: a fastest run slower by
+    more than `tolerance` (and by more than `floor` seconds), or a changed
+    move.
+
+    Moves are exact (every run is seeded); times are not. On a shared or
+    virtual machine the same tree's times can differ by up to 1.9x between
+    runs (medians and minimums alike: the load changes for seconds at a
+    time), so the default tolerance is 100% and `__main__` re-times
+    flagged positions (`retime`) before it reports them."""
+    problems = []
+    for name, report in results.items():
+        for position, now in report.items():
+            before = baseline.get(name, {}).get(position)
+            if before is None:
+                continue
+            if slower(now, before, tolerance, floor):
+                problems.append(
+                    f"{name} {position}: {before['min'] * 1e3:.2f}ms -> "
+                    f"{now['min'] * 1e3:.2f}ms"
+                )
+            if now["move"] != before["move"]:
+                problems.append(
+                    f"{name} {position}: move {before['move']} -> {now['move']}"
+                )
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time every model's run() on the fixed positions in data/bench"
+    )
+    parser.add_argument("models", nargs="*", help="class names to include (default: all)")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="runs per position (with fewer than 5, noise alone can exceed --tolerance)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="times a position that looks slower is re-timed before it counts",
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--save", action="store_true", help="overwrite the baseline with these results"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=1.0, help="allowed relative slowdown"
+    )
+    parser.add_argument(
+        "--floor", type=float, default=0.001, help="ignore slowdowns below this (s)"
+    )
+    args = parser.parse_args()
+
+    xsize, ysize, positions = load_positions()
+    entries = {}
+    results = {}
+    for entry in discover(args.models or None):
+        entries[entry.name] = entry
+        results[entry.name] = bench_entry(entry, xsize, ysize, positions, args.repeat)
+        print(f"==== {entry.name} ====")
+        for position, r in results[entry.name].items():
+            print(
+                f"{position:<16} {r['min'] * 1e3:9.2f}ms {r['nodes']:>9} nodes   {r['move']}"
+            )
+
+    if args.save:
+        baseline = {}
+        # a full run replaces the baseline, so entries that no longer exist
+        # (e.g. dropped `VARIANTS`) go; a run of some models merges them in
+        if args.models and os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=1)
+        print(f"Saved baseline: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for _ in range(args.retries):
+            retried = False
+            for name, report in results.items():
+                flagged = [
+                    position
+                    for position in positions
+                    if position["name"] in baseline.get(name, {})
+                    and slower(
+                        report[position["name"]],
+                        baseline[name][position["name"]],
+                        args.tolerance,
+                        args.floor,
+                    )
+                ]
+                if flagged:
+                    retime(entries[name], xsize, ysize, flagged, args.repeat, report)
+                    retried = True
+            if not retried:
+                break
+        problems = compare(results, baseline, args.tolerance, args.floor)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        print("No regressions")
@@ -6,9 +6,7 @@ import os.path
 import sys
 
 
-def _process_file(
-    file_path: str, module_to_skip: str | None
-) -> tuple[list[str], list[str]] | tuple[None, None]:
+def _process_file(file_path: str) -> tuple[list[str], list[str]] | tuple[None, None]:
     imports = []
     code_body = []
 
@@ -21,44 +19,66 @@ def _process_file(
         for line in f:
             stripped_line = line.strip()
             if stripped_line.startswith("import ") or stripped_line.startswith("from "):
-                if module_to_skip is None:
-                    imports.append(line.strip())
-                elif module_to_skip not in stripped_line:
-                    imports.append(line.rstrip())
+                # local `models.*` modules are inlined, so their imports are dropped
+                if not stripped_line.startswith("from models."):
+                    imports.append(stripped_line)
             else:
                 code_body.append(line.rstrip())
 
     return imports, code_body
 
 
-def make_main(
-    model_name: str,
-) -> None:
-    base_model_path = "./models/DotsBoxModel.py"
-    model_path = f"./models/{model_name}.py"
+def _local_dependencies(file_path: str) -> list[str]:
+    deps = []
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            stripped_line = line.strip()
+            if stripped_line.startswith("from models."):
+                deps.append(stripped_line.split()[1].removeprefix("models."))
+    return deps
 
-    base_imports, base_codes = _process_file(base_model_path, None)
-    if base_imports is None or base_codes is None:
-        raise Exception("Error processing base model file.")
 
-    sp_imports, sp_codes = _process_file(model_path, "DotsBoxModel")
+def _collect_modules(model_name: str) -> list[str]:
+    """`DotsBoxModel`, the model and every `models.*` module they use, in
+    dependency order so each inlined module is defined before it is used."""
+    ordered: list[str] = []
 
-    if sp_imports is None or sp_codes is None:
-        raise Exception("Error processing target model file.")
+    def visit(name: str) -> None:
+        if name in ordered:
+            return
+        path = f"./models/{name}.py"
+        if not os.path.exists(path):
+            raise Exception(f"Error processing model file: {path}")
+        for dep in _local_dependencies(path):
+            visit(dep)
+        ordered.append(name)
 
-    combined_imports = set(base_imports)
-    combined_imports.update(sp_imports)
+    visit("DotsBoxModel")
+    visit(model_name)
+    return ordered
+
+
+def make_main(
+    model_name: str,
+) -> None:
+    combined_imports = set()
+    sections = []
+    for module in _collect_modules(model_name):
+        imports, codes = _process_file(f"./models/{module}.py")
+        if imports is None or codes is None:
+            raise Exception(f"Error processing {module} file.")
+        combined_imports.update(imports)
+        sections.append(codes)
 
     with open("./main.py", "w", encoding="utf-8") as f:
         for imp in sorted(combined_imports):
             f.write(imp + "\n")
         f.write("\n\n")
 
-        for code in base_codes:
-            f.write(code + "\n")
-        f.write("\n\n")
-        for code in sp_codes:
-            f.write(code + "\n")
+        for codes in sections:
+            for code in codes:
+                f.write(code + "\n")
+            f.write("\n\n")
 
         f.write(
             f"""
@@ -86,12 +106,14 @@ if __name__ == "__main__":
         os.mkdir("dist")
 
     zf = zipfile.ZipFile(
-        f"dist/PunchRice-{datetime.datetime.now().strftime(r"%Y%m%d-%H%M%S")}.zip", "w"
+        f"dist/PunchRice-{datetime.datetime.now().strftime(r'%Y%m%d-%H%M%S')}.zip", "w"
     )
 
     zf.write("./main.py", compress_type=zipfile.ZIP_DEFLATED)
+    # only top-level files; subdirectories (e.g. data/bench) stay local
     for f in glob.glob("./data/*"):
-        zf.write(f, compress_type=zipfile.ZIP_DEFLATED)
+        if os.path.isfile(f):
+            zf.write(f, compress_type=zipfile.ZIP_DEFLATED)
     print("SUCCESSFULLY")
     os.remove("./main.py")
     print("Cleaning up...")
@@ -0,0 +1,49 @@
+#! /usr/bin/env python
+import argparse
+
+from models.endgame import (
+    ENDGAME_MAGIC,
+    Endgame,
+    endgame_multisets,
+    opening_value,
+)
+
+
+def solve(max_boxes: int) -> dict[Endgame, int]:
+    """Value of every simple loony endgame with at most `max_boxes` boxes:
+    the best `opening_value` over its components, the empty one being 0."""
+    values: dict[Endgame, int] = {}
+    # smaller endgames first, so every remainder is already solved
+    for chains, loops in sorted(
+        endgame_multisets(max_boxes), key=lambda k: sum(k[0]) + sum(k[1])
+    ):
+        best = 0 if not chains and not loops else None
+        for i, n in enumerate(chains):
+            rest = values[(chains[:i] + chains[i + 1 :], loops)]
+            val = opening_value(n, False, rest)
+            best = val if best is None else max(best, val)
+        for i, n in enumerate(loops):
+            rest = values[(chains, loops[:i] + loops[i + 1 :])]
+            val = opening_value(n, True, rest)
+            best = val if best is None else max(best, val)
+        values[(chains, loops)] = best
+    return values
+
+
+def write(path: str, max_boxes: int) -> int:
+    values = solve(max_boxes)
+    body = bytes(values[k] & 0xFF for k in endgame_multisets(max_boxes))
+    with open(path, "wb") as f:
+        f.write(ENDGAME_MAGIC + bytes([max_boxes]) + body)
+    return len(body)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write the strings-and-coins endgame table read by NimberH"
+    )
+    parser.add_argument("--max-boxes", type=int, default=25)
+    parser.add_argument("--out", default="./data/endgame.bin")
+    args = parser.parse_args()
+    n = write(args.out, args.max_boxes)
+    print(f"{n} endgames -> {args.out}")
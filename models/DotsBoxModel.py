@@ -1,10 +1,91 @@
+from models.bitboard import get_geometry
+from models.book import OpeningBook
+from models.movetracker import MoveTracker
+from models.ponder import Ponderer
+
+
 class DotsBoxModel:
     model = None
 
+    # optional stateful move tracking, see `track`
+    tracker: MoveTracker | None = None
+
+    # counters for the last `run()` call (e.g. "phase", "nodes", "cutoffs",
+    # "tt_hits", "nim_evals", "depth"); models assign a fresh dict each
+    # move and `Battle` records it next to the move time
+    stats: dict[str, int | str] = {}
+
+    # opening book file (`opening_book.py`), None for no book; see `open_book`
+    OPENING_BOOK: str | None = None
+    book: OpeningBook | None = None
+    book_loaded = False
+
+    # keep searching on the opponent's time (models that support it, see
+    # `models.ponder`); `Battle(ponder=...)` sets it per player
+    PONDER = False
+    ponderer: Ponderer | None = None
+
     def init(self):
-        pass
+        self.open_book()
+
+    def stop_pondering(self) -> None:
+        """Stop the background search, e.g. once the game is over."""
+        if self.ponderer is not None:
+            self.ponderer.stop()
+
+    def open_book(self) -> OpeningBook | None:
+        """This model's `OpeningBook`, memory-mapped on first use (`init`, or
+        the first move when the caller never calls `init`)."""
+        if not self.book_loaded:
+            if self.OPENING_BOOK is not None:
+                self.book = OpeningBook.open(self.OPENING_BOOK)
+            self.book_loaded = True
+        return self.book
+
+    def book_move(self, bits: int, xsize: int, ysize: int) -> int | None:
+        """The opening book's edge for packed board `bits`, if it has one."""
+        book = self.open_book()
+        if book is None or book.symmetry.geo is not get_geometry(xsize, ysize):
+            return None
+        return book.move(bits)
+
+    def on_game_start(self, player: int, xsize: int, ysize: int) -> None:
+        """Called by `Battle` before a game in which this model is `player`."""
+        if self.tracker is not None:
+            self.tracker.reset(0)
+
+    def on_move(self, player: int, move: list[int], completed: int) -> None:
+        """Called by `Battle` after every legal move of either player
+        (`completed` boxes), so models can keep incremental state instead
+        of re-reading the board in `run`."""
+        if self.tracker is not None:
+            self.tracker.play(self.tracker.geo.edge_of(move))
 
     def run(
         self, board_lines: list[list[list[int]]], xsize: int, ysize: int
     ) -> list[int]:
         return [0, 0, 0]
+
+    def run_batch(
+        self, boards: list[list[list[list[int]]]], xsize: int, ysize: int
+    ) -> list[list[int]]:
+        """Moves for several independent positions (e.g. interleaved games).
+
+        The default just calls `run` on each board; models override it to
+        share work across the batch.
+        """
+        return [self.run(board_lines, xsize, ysize) for board_lines in boards]
+
+    def track(
+        self, board_lines: list[list[list[int]]], xsize: int, ysize: int
+    ) -> MoveTracker:
+        """This model's `MoveTracker`, brought up to date with `board_lines`.
+
+        Models that opt in call this at the top of `run()` instead of
+        scanning and classifying every edge each turn.
+        """
+        geo = get_geometry(xsize, ysize)
+        if self.tracker is None or self.tracker.geo is not geo:
+            self.tracker = MoveTracker(geo)
+        self.tracker.sync(board_lines)
+        return self.tracker
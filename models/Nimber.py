@@ -1,8 +1,10 @@
 import random
 import copy
-from typing import List, Set, Tuple  # 타입 힌트 추가
 
 from models.DotsBoxModel import DotsBoxModel
+from models.bitboard import BoardGeometry, get_geometry
+from models.components import ComponentTracker
+from models.nimstring import NimstringEvaluator
 
 # --- 2. V5 (님버 하이브리드) 에이전트 클래스 ---
 
@@ -14,185 +16,8 @@ class Nimber(DotsBoxModel):
         self.xsize: int = None  # type: ignore
         self.ysize: int = None  # type: ignore
         self.board_lines: list[list[list[int]]] = None  # type: ignore
-
-    # --- [Phase 1] V1/V4의 헬퍼 메서드들 ---
-
-    def get_all_empty_moves(self) -> List[List[int]]:
-        """현재 그을 수 있는 모든 '빈' 선의 목록을 반환합니다."""
-        empty_moves = []
-        for x in range(self.xsize):
-            for y in range(self.ysize + 1):
-                if self.board_lines[x][y][0] == 0:
-                    empty_moves.append([x, y, 0])
-        for x in range(self.xsize + 1):
-            for y in range(self.ysize):
-                if self.board_lines[x][y][1] == 0:
-                    empty_moves.append([x, y, 1])
-        return empty_moves
-
-    def get_adjacent_box_side_counts(self, move: List[int]) -> List[int]:
-        """'move'를 그었을 때 인접한 상자(들)의 3면 상태를 반환."""
-        x, y, z = move
-        counts = []
-        if z == 0:  # 가로선
-            if y > 0:
-                counts.append(
-                    self.board_lines[x][y - 1][0]
-                    + self.board_lines[x][y - 1][1]
-                    + self.board_lines[x + 1][y - 1][1]
-                )
-            if y < self.ysize:
-                counts.append(
-                    self.board_lines[x][y + 1][0]
-                    + self.board_lines[x][y][1]
-                    + self.board_lines[x + 1][y][1]
-                )
-        else:  # 세로선
-            if x > 0:
-                counts.append(
-                    self.board_lines[x - 1][y][1]
-                    + self.board_lines[x - 1][y][0]
-                    + self.board_lines[x - 1][y + 1][0]
-                )
-            if x < self.xsize:
-                counts.append(
-                    self.board_lines[x + 1][y][1]
-                    + self.board_lines[x][y][0]
-                    + self.board_lines[x][y + 1][0]
-                )
-        return counts
-
-    def count_box_sides(self, x: int, y: int) -> int:
-        """(x, y) 상자의 채워진 변 개수를 셉니다."""
-        return (
-            self.board_lines[x][y][0]
-            + self.board_lines[x][y + 1][0]
-            + self.board_lines[x][y][1]
-            + self.board_lines[x + 1][y][1]
-        )
-
-    # --- [Phase 2] V6 님버 헬퍼 메서드들 (버그 수정됨) ---
-
-    def _get_box_side_counts_grid(self) -> List[List[int]]:
-        """모든 상자(box)의 현재 변(side) 개수를 2D 배열로 만들어 반환."""
-        grid = [[0 for _ in range(self.ysize)] for _ in range(self.xsize)]
-        for x in range(self.xsize):
-            for y in range(self.ysize):
-                grid[x][y] = self.count_box_sides(x, y)
-        return grid
-
-    def _dfs_find_component(
-        self,
-        x: int,
-        y: int,
-        side_counts_grid: List[List[int]],
-        visited: Set[Tuple[int, int]],
-    ) -> Set[Tuple[int, int]]:
-        """
-        [V6 수정] DFS로 '2면' 상자 컴포넌트에 속한 모든 노드(상자)의
-        좌표 집합(Set)을 반환합니다.
-        """
-        # (x, y)가 방문했거나, 보드 밖이거나, 2면이 아니면 탐색 중지
-        if (
-            (x, y) in visited
-            or x < 0
-            or y < 0
-            or x >= self.xsize
-            or y >= self.ysize
-            or side_counts_grid[x][y] != 2
-        ):
-            return set()
-
-        visited.add((x, y))
-        component_nodes = {(x, y)}
-
-        # 닫힌 '선'을 통해서만 2면체 이웃으로 이동
-        # 위쪽 (x, y-1)
-        if y > 0 and self.board_lines[x][y][0] == 1:  # 위쪽 선(Top)이 닫혀있음
-            component_nodes.update(
-                self._dfs_find_component(x, y - 1, side_counts_grid, visited)
-            )
-
-        # 아래쪽 (x, y+1)
-        if (
-            y < self.ysize - 1 and self.board_lines[x][y + 1][0] == 1
-        ):  # 아래쪽 선(Bottom)이 닫혀있음
-            component_nodes.update(
-                self._dfs_find_component(x, y + 1, side_counts_grid, visited)
-            )
-
-        # 왼쪽 (x-1, y)
-        if x > 0 and self.board_lines[x][y][1] == 1:  # 왼쪽 선(Left)이 닫혀있음
-            component_nodes.update(
-                self._dfs_find_component(x - 1, y, side_counts_grid, visited)
-            )
-
-        # 오른쪽 (x+1, y)
-        if (
-            x < self.xsize - 1 and self.board_lines[x + 1][y][1] == 1
-        ):  # 오른쪽 선(Right)이 닫혀있음
-            component_nodes.update(
-                self._dfs_find_component(x + 1, y, side_counts_grid, visited)
-            )
-
-        return component_nodes
-
-    def _calculate_nim_sum(self) -> int:
-        """
-        [V6 재설계]
-        현재 'self.board_lines' 상태에서 '루프'와 '체인'을
-        정확히 구별하여 '님 합(Nim-Sum)'을 계산합니다.
-        """
-        side_counts_grid = self._get_box_side_counts_grid()
-        visited = set()
-        nim_sum = 0
-
-        for x in range(self.xsize):
-            for y in range(self.ysize):
-                # '2면'을 가졌고, 아직 방문하지 않은 컴포넌트의 시작점 발견
-                if side_counts_grid[x][y] == 2 and (x, y) not in visited:
-
-                    # 1. 이 컴포넌트에 속한 모든 상자(노드)를 찾음
-                    component_nodes = self._dfs_find_component(
-                        x, y, side_counts_grid, visited
-                    )
-                    component_size = len(component_nodes)
-
-                    if component_size == 0:
-                        continue
-
-                    # 2. [핵심] 이 컴포넌트가 '체인'인지 '루프'인지 판별
-                    #    컴포넌트의 노드 중 하나라도 '3면' 상자와 인접하면 '체인'
-                    is_a_chain = False
-                    for cx, cy in component_nodes:
-                        # (cx, cy) 상자의 4방향 이웃 상자 확인
-                        neighbors = [
-                            (cx, cy - 1),
-                            (cx, cy + 1),
-                            (cx - 1, cy),
-                            (cx + 1, cy),
-                        ]
-                        for nx, ny in neighbors:
-                            # 이웃이 보드 범위 내에 있고
-                            if 0 <= nx < self.xsize and 0 <= ny < self.ysize:
-                                # 이웃이 '3면' 상자라면
-                                if side_counts_grid[nx][ny] == 3:
-                                    is_a_chain = True
-                                    break
-                        if is_a_chain:
-                            break
-
-                    # 3. 올바른 님버(g-value) 할당
-                    g_value = 0
-                    if is_a_chain:
-                        g_value = component_size  # 체인(길이 N) -> 님버 N
-                    else:
-                        g_value = 1  # 루프(길이 N) -> 님버 1
-
-                    # 4. XOR 연산
-                    nim_sum ^= g_value
-
-        return nim_sum
+        self.geo: BoardGeometry = None  # type: ignore
+        self.nimstring: NimstringEvaluator = None  # type: ignore
 
     # --- HAIC가 호출하는 메인 실행 함수 ---
 
@@ -211,28 +36,22 @@ class Nimber(DotsBoxModel):
         if self.xsize is None:
             self.xsize = xsize
             self.ysize = ysize
+            self.geo = get_geometry(xsize, ysize)
+            self.nimstring = NimstringEvaluator(self.geo)
+        bits = self.geo.pack(board_lines)
 
-        # 3. [Phase 1 감지] V1 탐욕법 로직으로 모든 수 분류
-        all_empty_moves = self.get_all_empty_moves()
+        # 3. [Phase 1 감지] V1 탐욕법 로직으로 모든 수 분류 (비트보드 위에서)
+        # [P1] 내가 점수를 얻는 수 / [P2] 상대에게 점수를 주지 않는 수 /
+        # [P3] 어쩔 수 없이 상대에게 점수를 주는 수
+        winning_edges, safe_edges, unsafe_edges = self.geo.classify(bits)
 
-        if not all_empty_moves:
+        self.stats = {"phase": "greedy"}  # 이번 수의 계측값 (Battle이 기록)
+        if not (winning_edges or safe_edges or unsafe_edges):
             return [0, 0, 0]  # 게임 종료
 
-        winning_moves = []  # [P1] 내가 점수를 얻는 수
-        safe_moves = []  # [P2] 상대에게 점수를 주지 않는 수
-        unsafe_moves = []  # [P3] 어쩔 수 없이 상대에게 점수를 주는 수
-
-        for move in all_empty_moves:
-            side_counts = self.get_adjacent_box_side_counts(move)
-            is_winning_move = 3 in side_counts
-            is_unsafe_move = 2 in side_counts
-
-            if is_winning_move:
-                winning_moves.append(move)
-            elif is_unsafe_move:
-                unsafe_moves.append(move)
-            else:
-                safe_moves.append(move)
+        winning_moves = [self.geo.move_of(e) for e in winning_edges]
+        safe_moves = [self.geo.move_of(e) for e in safe_edges]
+        unsafe_moves = [self.geo.move_of(e) for e in unsafe_edges]
 
         # 4. [ V6 분기점 ]
 
@@ -251,21 +70,27 @@ class Nimber(DotsBoxModel):
 
         winning_nim_moves = []  # '님 합'을 0으로 만드는 필승의 수
 
-        for move in unsafe_moves:
-
-            # 가상으로 수 두기 (self.board_lines를 직접 수정)
-            x, y, z = move
-            self.board_lines[x][y][z] = 1
+        # 성분(component)별 정확한 님스트링 값 (모양별로 메모, 같은 모양은 조회 1번)
+        # 너무 큰 성분이 있으면 체인/루프 근사(ComponentTracker)로 대신함
+        evaluated = self.nimstring.evaluated
+        values = [self.nimstring.move_value(bits, edge) for edge in unsafe_edges]
+        if None in values:
+            # 체인/루프 분해는 1번만 만들고, 후보 수마다 그 수 주변만 다시 계산
+            components = ComponentTracker(self.geo, bits)
+            values = [components.nim_sum_after(edge) for edge in unsafe_edges]
 
-            # 수를 둔 *다음* 상태의 [V6] '님 합' 계산
-            next_nim_sum = self._calculate_nim_sum()
+        for value, move in zip(values, unsafe_moves):
 
-            # 님 합이 0이 되는 수를 찾았는가?
-            if next_nim_sum == 0:
+            # 수를 둔 *다음* 상태의 '님 합'이 0이 되는 수를 찾았는가?
+            # (-1: 상대가 따먹기를 거절할 수 있는 loony 수)
+            if value == 0:
                 winning_nim_moves.append(move)
 
-            # 가상으로 둔 수 되돌리기
-            self.board_lines[x][y][z] = 0
+        self.stats = {
+            "phase": "nim",
+            "nim_evals": len(unsafe_edges),
+            "nim_shapes": self.nimstring.evaluated - evaluated,
+        }
 
         # 4-3. 결과 반환
         if winning_nim_moves:
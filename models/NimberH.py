@@ -1,7 +1,15 @@
 import random
-from typing import List, Set, Tuple  # 타입 힌트 추가
+import time
 
 from models.DotsBoxModel import DotsBoxModel
+from models.bitboard import BoardGeometry, get_geometry
+from models.components import ComponentTracker
+from models.endgame import EndgameTable, opening_edge, simple_components
+from models.nimstring import NimstringEvaluator
+from models.ponder import Ponderer
+from models.search import NegamaxSearch
+from models.solver import EndgameSolver
+from models.symmetry import get_symmetry
 
 
 # -----------------------------------------------------------------
@@ -25,8 +33,41 @@ class NimberH(DotsBoxModel):
     SEARCH_DEPTH = 5
     
     # 2. Phase 1a(초반) -> Phase 1b(후반)로 전환할 시점
-    # V4.2와 동일한 '0.2'를 사용하여 같은 시점에 수읽기 시작
-    MINIMAX_TRANSITION_RATIO = 0.2 
+    # 5x5에서 안전한 수는 빈 선이 30개 안팎일 때 바닥나므로 '0.5'에서 수읽기 시작
+    # (0.2면 빈 선 12개 이하로 SOLVE_EDGES와 겹쳐 수읽기 단계가 한 번도 돌지 않음)
+    MINIMAX_TRANSITION_RATIO = 0.5
+
+    # 3. Phase 1b 전치표(transposition table) 크기 (2^N 슬롯, 게임 내내 유지)
+    TT_SIZE_LOG2 = 16
+
+    # 4. 수당 시간 제한(초). None이면 SEARCH_DEPTH 고정 깊이,
+    # 값이 있으면 마감 시간까지 반복 심화(iterative deepening)
+    TIME_LIMIT: float | None = None
+
+    # 5. True면 매 턴 전체 보드를 다시 분류하지 않고 DotsBoxModel.track()으로
+    # 바뀐 선 주변만 갱신
+    TRACK_MOVES = False
+
+    # 6. True면 전치표가 대칭(회전/반전)인 국면을 한 항목으로 공유
+    SYMMETRIC_TT = False
+
+    # 7. True면 연속 따먹기를 한 수(매크로 수)로 묶고, 깊이가 다 돼도 따먹을 상자가
+    # 남아 있으면 끝까지 읽음 (quiescence)
+    COMPRESS_CAPTURES = True
+
+    # 8. 빈 선이 이 개수 이하이면 EndgameSolver로 끝까지 정확히 풀어서 둠 (0이면 끔)
+    SOLVE_EDGES = 12
+
+    # 9. 체인/루프만 남은 엔드게임의 값 표 (endgame_table.py로 생성, 없으면 님버 계산)
+    ENDGAME_TABLE = "data/endgame.bin"
+
+    # 10. 초반 수 오프닝 북 (opening_book.py로 생성, None이면 무작위 안전한 수)
+    # 기본은 끔: 지금 data/opening.bin은 자리표시용
+    OPENING_BOOK = None
+
+    # 11. True면 Phase 1b에서 수를 둔 뒤 상대 차례 동안 상대의 유력한 응수 뒤 국면을
+    # 백그라운드 스레드로 미리 탐색 (pondering, models/ponder.py)
+    PONDER = False
     
     
     def __init__(self):
@@ -35,150 +76,74 @@ class NimberH(DotsBoxModel):
         self.ysize: int = None # type: ignore
         self.board_lines: list[list[list[int]]] = None # type: ignore
         self.total_moves_possible: int = 0
-
-    # --- [공통] 기본 헬퍼 메서드들 ---
-    
-    def get_all_empty_moves(self, board_state: List[List[List[int]]]) -> List[List[int]]:
-        empty_moves = []
-        for x in range(self.xsize):
-            for y in range(self.ysize + 1):
-                if board_state[x][y][0] == 0: empty_moves.append([x, y, 0])
-        for x in range(self.xsize + 1):
-            for y in range(self.ysize):
-                if board_state[x][y][1] == 0: empty_moves.append([x, y, 1])
-        return empty_moves
-
-    def get_adjacent_box_side_counts(self, move: List[int]) -> List[int]:
-        x, y, z = move
-        counts = []
-        if z == 0:
-            if y > 0: counts.append(self.board_lines[x][y - 1][0] + self.board_lines[x][y - 1][1] + self.board_lines[x + 1][y - 1][1])
-            if y < self.ysize: counts.append(self.board_lines[x][y + 1][0] + self.board_lines[x][y][1] + self.board_lines[x + 1][y][1])
-        else:
-            if x > 0: counts.append(self.board_lines[x - 1][y][1] + self.board_lines[x - 1][y][0] + self.board_lines[x - 1][y + 1][0])
-            if x < self.xsize: counts.append(self.board_lines[x + 1][y][1] + self.board_lines[x][y][0] + self.board_lines[x][y + 1][0])
-        return counts
-
-    def count_box_sides(self, board_state: List[List[List[int]]], x: int, y: int) -> int:
-        return board_state[x][y][0] + board_state[x][y + 1][0] + board_state[x][y][1] + board_state[x + 1][y][1]
+        self.geo: BoardGeometry = None # type: ignore
+        self.bits: int = 0
+        self.search: NegamaxSearch = None # type: ignore
+        self.solver: EndgameSolver = None # type: ignore
+        self.nimstring: NimstringEvaluator = None # type: ignore
+        self.table: EndgameTable | None = None
+        self.table_loaded = False
+
+    def on_game_start(self, player: int, xsize: int, ysize: int) -> None:
+        """새 게임: 이전 게임에서 탐색한 결과(전치표, 미리 탐색한 수)가 이번 게임의 수를
+        바꾸지 않도록 비움."""
+        super().on_game_start(player, xsize, ysize)
+        self.stop_pondering()
+        if self.ponderer is not None:
+            self.ponderer.results = {}
+        if self.search is not None:
+            self.search.new_game()
+        if self.solver is not None:
+            self.solver.new_game()
 
     # --- [Phase 1b] V4.2 Minimax 헬퍼 메서드들 ---
 
-    def _get_move_score(self, move: List[int]) -> int:
+    def _get_move_score(self, move: int) -> int:
         """'수순 정렬(Move Ordering)'을 위한 점수 계산 (현재 보드 기준)."""
-        side_counts = self.get_adjacent_box_side_counts(move)
-        if 3 in side_counts: return 100
-        if 2 in side_counts: return -100
-        return 0
-
-    def _get_completed_boxes_count(self, board_state: List[List[List[int]]], move: List[int]) -> int:
-        x, y, z = move
-        completed = 0
-        if z == 0:
-            if y > 0 and self.count_box_sides(board_state, x, y - 1) == 3: completed += 1
-            if y < self.ysize and self.count_box_sides(board_state, x, y) == 3: completed += 1
-        else:
-            if x > 0 and self.count_box_sides(board_state, x - 1, y) == 3: completed += 1
-            if x < self.xsize and self.count_box_sides(board_state, x, y) == 3: completed += 1
-        return completed
-
-    def _evaluate_heuristic(self, board_state: List[List[List[int]]]) -> int:
-        score = 0
-        for x in range(self.xsize):
-            for y in range(self.ysize):
-                sides = self.count_box_sides(board_state, x, y)
-                if sides == 3: score += 100
-                elif sides == 2: score -= 50
-        return score
-
-    def _negamax_undo(self, board_state: List[List[List[int]]], depth: int, alpha: float, beta: float) -> float:
-        if depth == 0:
-            return self._evaluate_heuristic(board_state)
-
-        available_moves = self.get_all_empty_moves(board_state)
-        if not available_moves:
-            return 0 
-        
-        max_eval = -float('inf')
-
-        for move in available_moves:
-            x, y, z = move
-            boxes_completed = self._get_completed_boxes_count(board_state, move)
-            board_state[x][y][z] = 1 # 수 두기
-            
-            eval_score = 0
-            if boxes_completed > 0:
-                eval_score = boxes_completed + self._negamax_undo(board_state, depth - 1, alpha, beta)
-            else:
-                eval_score = -self._negamax_undo(board_state, depth - 1, -beta, -alpha)
-
-            board_state[x][y][z] = 0 # 수 되돌리기
-            
-            max_eval = max(max_eval, eval_score)
-            alpha = max(alpha, max_eval)
-            if alpha >= beta:
-                break
-        return max_eval
-
-    # --- [Phase 2] V6 Nimber 헬퍼 메서드들 ---
-
-    def _get_box_side_counts_grid(self) -> List[List[int]]:
-        grid = [[0 for _ in range(self.ysize)] for _ in range(self.xsize)]
-        for x in range(self.xsize):
-            for y in range(self.ysize):
-                grid[x][y] = self.count_box_sides(self.board_lines, x, y)
-        return grid
-
-    def _dfs_find_component(
-        self, 
-        x: int, 
-        y: int, 
-        side_counts_grid: List[List[int]], 
-        visited: Set[Tuple[int, int]]
-    ) -> Set[Tuple[int, int]]:
-        if (x, y) in visited or \
-           x < 0 or y < 0 or x >= self.xsize or y >= self.ysize or \
-           side_counts_grid[x][y] != 2:
-            return set()
-
-        visited.add((x, y))
-        component_nodes = {(x, y)}
-        
-        if y > 0 and self.board_lines[x][y][0] == 1:
-            component_nodes.update(self._dfs_find_component(x, y - 1, side_counts_grid, visited))
-        if y < self.ysize - 1 and self.board_lines[x][y + 1][0] == 1:
-            component_nodes.update(self._dfs_find_component(x, y + 1, side_counts_grid, visited))
-        if x > 0 and self.board_lines[x][y][1] == 1:
-            component_nodes.update(self._dfs_find_component(x - 1, y, side_counts_grid, visited))
-        if x < self.xsize - 1 and self.board_lines[x + 1][y][1] == 1:
-            component_nodes.update(self._dfs_find_component(x + 1, y, side_counts_grid, visited))
-        return component_nodes
-
-    def _calculate_nim_sum(self) -> int:
-        side_counts_grid = self._get_box_side_counts_grid()
-        visited = set()
-        nim_sum = 0
-        
-        for x in range(self.xsize):
-            for y in range(self.ysize):
-                if side_counts_grid[x][y] == 2 and (x, y) not in visited:
-                    component_nodes = self._dfs_find_component(x, y, side_counts_grid, visited)
-                    component_size = len(component_nodes)
-                    if component_size == 0: continue
-
-                    is_a_chain = False
-                    for (cx, cy) in component_nodes:
-                        neighbors = [(cx, cy - 1), (cx, cy + 1), (cx - 1, cy), (cx + 1, cy)]
-                        for (nx, ny) in neighbors:
-                            if 0 <= nx < self.xsize and 0 <= ny < self.ysize:
-                                if side_counts_grid[nx][ny] == 3:
-                                    is_a_chain = True
-                                    break
-                        if is_a_chain: break
-                    
-                    g_value = component_size if is_a_chain else 1
-                    nim_sum ^= g_value
-        return nim_sum
+        return self.geo.move_score(self.bits, move)
+
+    def _table_move(self) -> list[int] | None:
+        """엔드게임 표로 고른 수 (표가 없거나 단순 체인/루프 국면이 아니면 None)."""
+        if not self.table_loaded:
+            self.table = EndgameTable.load(self.ENDGAME_TABLE)
+            self.table_loaded = True
+        if self.table is None:
+            return None
+        components = simple_components(self.geo, self.bits)
+        if components is None:
+            return None
+        chains = tuple(sorted(len(c) for c, is_loop in components if not is_loop))
+        loops = tuple(sorted(len(c) for c, is_loop in components if is_loop))
+        best = self.table.best_opening(chains, loops)
+        if best is None:
+            return None
+        n, is_loop, _ = best
+        boxes = next(c for c, l in components if l == is_loop and len(c) == n)
+        self.stats = {"phase": "table"}
+        return self.geo.move_of(opening_edge(self.geo, self.bits, boxes, is_loop))
+
+    def _search_moves(self, bits: int) -> list[int] | None:
+        """Phase 1b에서 `bits`에 대해 탐색할 (정렬된) 안전한 수, 탐색하지 않는 국면이면 None
+        (Ponderer용, 스레드에서 불리므로 self.bits를 쓰지 않음)."""
+        num_empty_moves = self.geo.num_edges - bits.bit_count()
+        if (
+            num_empty_moves <= self.SOLVE_EDGES
+            or num_empty_moves > self.total_moves_possible * self.MINIMAX_TRANSITION_RATIO
+        ):
+            return None
+        winning_edges, safe_edges, _ = self.geo.classify(bits)
+        if winning_edges or not safe_edges:
+            return None
+        return sorted(safe_edges, key=lambda m: self.geo.move_score(bits, m), reverse=True)
+
+    def _play(self, edge: int) -> list[int]:
+        """안전한 수 `edge`를 둠. PONDER면 상대 차례 동안 다음 국면들을 미리 탐색
+        (안전한 수는 상자를 완성하지 않으므로 다음은 상대 차례)."""
+        if self.PONDER:
+            if self.ponderer is None:
+                self.ponderer = Ponderer(self.search, self.SEARCH_DEPTH, self._search_moves)
+            self.ponderer.ponder_replies(self.bits | (1 << edge))
+        return self.geo.move_of(edge)
 
     # --- HAIC가 호출하는 메인 실행 함수 ---
 
@@ -187,10 +152,11 @@ class NimberH(DotsBoxModel):
     ) -> list[int]:
         """
         V8 (최종 하이브리드)
-        V4.2의 튜닝 값 (5, 0.2)와 V6의 님버를 결합합니다.
+        V4.2의 탐색 깊이 5와 V6의 님버를 결합합니다.
         """
         
         # 1. [매 턴] 클래스 상태 업데이트
+        start = time.perf_counter()
         self.board_lines = board_lines
         
         # 2. [최초 1회] 초기화
@@ -198,77 +164,101 @@ class NimberH(DotsBoxModel):
             self.xsize = xsize
             self.ysize = ysize
             self.total_moves_possible = (xsize * (ysize+1)) + (ysize * (xsize+1))
-
-        # 3. [Phase 감지] 모든 수 분류
-        all_empty_moves = self.get_all_empty_moves(self.board_lines)
-        num_empty_moves = len(all_empty_moves)
+            self.geo = get_geometry(xsize, ysize)
+            symmetry = get_symmetry(xsize, ysize) if self.SYMMETRIC_TT else None
+            self.search = NegamaxSearch(
+                self.geo, self.TT_SIZE_LOG2, symmetry, self.COMPRESS_CAPTURES
+            )
+            self.solver = EndgameSolver(self.geo)
+            self.nimstring = NimstringEvaluator(self.geo)
+
+        # 3. [Phase 감지] 모든 수 분류 (비트보드 위에서, TRACK_MOVES면 바뀐 곳만 갱신)
+        if self.TRACK_MOVES:
+            tracker = self.track(board_lines, xsize, ysize)
+            self.bits = tracker.bits
+            winning_edges = tracker.winning.items
+            safe_edges = tracker.safe.items
+            unsafe_edges = tracker.unsafe.items
+        else:
+            self.bits = self.geo.pack(board_lines)
+            winning_edges, safe_edges, unsafe_edges = self.geo.classify(self.bits)
+        num_empty_moves = len(winning_edges) + len(safe_edges) + len(unsafe_edges)
+        # 상대 차례 동안 미리 탐색해 둔 수 (pondering 중이었으면 여기서 멈춤)
+        pondered = self.ponderer.move(self.bits) if self.ponderer is not None else None
+        self.stats = {"phase": "greedy"} # 이번 수의 계측값 (Battle이 기록)
         if num_empty_moves == 0: return [0, 0, 0]
 
-        winning_moves, safe_moves, unsafe_moves = [], [], []
-        for move in all_empty_moves:
-            side_counts = self.get_adjacent_box_side_counts(move)
-            is_winning_move = 3 in side_counts
-            is_unsafe_move = 2 in side_counts
-
-            if is_winning_move: winning_moves.append(move)
-            elif is_unsafe_move: unsafe_moves.append(move)
-            else: safe_moves.append(move)
-
         # 4. [ V8 분기점 ]
+
+        # 4-0. [엔드게임] 남은 선이 적으면 완전 탐색으로 최선의 수
+        if num_empty_moves <= self.SOLVE_EDGES:
+            edges = sorted(self.geo.empty_edges(self.bits), key=lambda m: self._get_move_score(m), reverse=True)
+            best_move, _ = self.solver.best_move(self.bits, edges)
+            self.stats = {"phase": "solve", "nodes": self.solver.solved}
+            return self.geo.move_of(best_move)
         
         # 4-A. [필승] P1(필승) 수가 있으면 즉시 실행 (가장 빠름)
-        if winning_moves:
-            return random.choice(winning_moves)
+        if winning_edges:
+            return self.geo.move_of(random.choice(winning_edges))
 
         # 4-B. [Phase 1: "Loony Phase"] P2(안전) 수가 1개라도 존재하는가?
-        if safe_moves:
+        if safe_edges:
             
             # [V8 속도 개선] 지금이 초반/중반인가?
             if num_empty_moves > self.total_moves_possible * self.MINIMAX_TRANSITION_RATIO:
                 # [Phase 1a - 초반/중반] (V4.2와 동일한 전략)
-                # -> '무작위' 안전한 수를 둔다 (매우 빠름)
-                return random.choice(safe_moves)
+                # -> 오프닝 북에 있는 국면이면 북의 수
+                edge = self.book_move(self.bits, xsize, ysize)
+                if edge is not None:
+                    self.stats = {"phase": "book"}
+                    return self.geo.move_of(edge)
+                # -> 아니면 '무작위' 안전한 수를 둔다 (매우 빠름)
+                return self._play(random.choice(safe_edges))
             
             else:
                 # [Phase 1b - 후반] (V4.2와 동일한 전략)
                 # -> Minimax(수읽기)로 '최적의' 안전한 수를 찾는다
-                best_move = safe_moves[0]
-                best_eval = -float('inf')
-                alpha = -float('inf')
-                beta = float('inf')
-                board_copy = [[[v for v in z] for z in y] for y in self.board_lines]
-                
-                # 수순 정렬
-                safe_moves.sort(key=lambda m: self._get_move_score(m), reverse=True)
-
-                for move in safe_moves:
-                    x, y, z = move
-                    board_copy[x][y][z] = 1 # 수 두기
-                    eval_score = -self._negamax_undo(board_copy, self.SEARCH_DEPTH - 1, -beta, -alpha)
-                    board_copy[x][y][z] = 0 # 수 되돌리기
-                        
-                    if eval_score > best_eval:
-                        best_eval = eval_score
-                        best_move = move
-                    alpha = max(alpha, best_eval)
-
-                return best_move
+                if self.TIME_LIMIT is None and pondered is not None:
+                    # 상대 차례 동안 같은 깊이로 이미 탐색해 둔 국면
+                    best_move = pondered
+                    self.stats = {"phase": "ponder", "pondered": self.ponderer.pondered}
+                else:
+                    # 수순 정렬 (tracker의 내부 리스트를 건드리지 않도록 복사본을 정렬)
+                    safe_edges = sorted(safe_edges, key=lambda m: self._get_move_score(m), reverse=True)
+
+                    # 공용 negamax (전치표 재사용)
+                    if self.TIME_LIMIT is None:
+                        best_move, _ = self.search.search(self.bits, safe_edges, self.SEARCH_DEPTH)
+                    else:
+                        best_move, _ = self.search.search_until(self.bits, safe_edges, start + self.TIME_LIMIT)
+                    self.stats = {"phase": "negamax", **self.search.counters()}
+
+                return self._play(best_move)
             
         # 4-C. [Phase 2: "Impartial Phase"]
         # P1, P2가 없음. P3(불리한 수)만 남은 엔드게임.
         else: 
-            # -> V6의 '수학(님버)' 계산 시작
-            winning_nim_moves = []
-            for move in unsafe_moves:
-                x, y, z = move
-                self.board_lines[x][y][z] = 1
-                next_nim_sum = self._calculate_nim_sum()
-                self.board_lines[x][y][z] = 0
-                
-                if next_nim_sum == 0:
-                    winning_nim_moves.append(move)
+            # -> 체인/루프만 남았으면 표에서 바로 최선의 수
+            move = self._table_move()
+            if move is not None:
+                return move
+
+            # -> 성분별 정확한 님스트링 값 (모양별 메모), 너무 큰 성분이 있으면
+            # 체인/루프 근사(ComponentTracker)로 대신함
+            evaluated = self.nimstring.evaluated
+            values = [self.nimstring.move_value(self.bits, e) for e in unsafe_edges]
+            if None in values:
+                components = ComponentTracker(self.geo, self.bits)
+                values = [components.nim_sum_after(e) for e in unsafe_edges]
+            unsafe_moves = [self.geo.move_of(e) for e in unsafe_edges]
+            winning_nim_moves = [m for v, m in zip(values, unsafe_moves) if v == 0]
+            self.stats = {
+                "phase": "nim",
+                "nim_evals": len(unsafe_edges),
+                "nim_shapes": self.nimstring.evaluated - evaluated,
+            }
 
             if winning_nim_moves:
                 return random.choice(winning_nim_moves)
             else:
-                return random.choice(unsafe_moves)
\ No newline at end of file
+                return random.choice(unsafe_moves)
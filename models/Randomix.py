@@ -1,20 +1,21 @@
 import random
 
 from models.DotsBoxModel import DotsBoxModel
+from models.bitboard import get_geometry
 
 class Randomix(DotsBoxModel):
     """Random move model."""
 
+    def __init__(self, track_moves: bool = False) -> None:
+        self.TRACK_MOVES = track_moves
+
     def run(
         self, board_lines: list[list[list[int]]], xsize: int, ysize: int
     ) -> list[int]:
-        empty_moves: list[list[int]] = []
-        for x in range(xsize):
-            for y in range(ysize + 1):
-                if board_lines[x][y][0] == 0:
-                    empty_moves.append([x, y, 0])
-        for x in range(xsize + 1):
-            for y in range(ysize):
-                if board_lines[x][y][1] == 0:
-                    empty_moves.append([x, y, 1])
-        return random.choice(empty_moves)
\ No newline at end of file
+        geo = get_geometry(xsize, ysize)
+        self.stats = {"phase": "random"}
+        if self.TRACK_MOVES:
+            tracker = self.track(board_lines, xsize, ysize)
+            return geo.move_of(random.choice(tracker.empty.items))
+        empty_moves = geo.empty_edges(geo.pack(board_lines))
+        return geo.move_of(random.choice(empty_moves))
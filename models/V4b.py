@@ -1,196 +1,167 @@
 import random
+import time
 
 from models.DotsBoxModel import DotsBoxModel
+from models.bitboard import BoardGeometry, get_geometry
+from models.ponder import Ponderer
+from models.search import NegamaxSearch
+from models.solver import EndgameSolver
+from models.symmetry import get_symmetry
 
 
 class V4b(DotsBoxModel):
     """V4.2 model (Negamax + greedy phase) ported from `main.py`.
 
     Early/Mid game: greedy heuristic avoiding giving boxes.
-    Late game (<=20% moves left): depth-limited negamax with undo.
+    Late game (<=50% moves left, about when safe moves run out on 5x5):
+    depth-limited negamax with a transposition table kept across `run()`
+    calls. `RATIO` must leave more than `solve_edges` edges to the search,
+    or the negamax phase never runs. With `time_limit`
+    (seconds per move) the late game deepens iteratively until the deadline
+    instead of stopping at `search_depth`. `track_moves` keeps the move
+    classes up to date across turns instead of re-scanning the board.
+    `symmetric_tt` shares transposition table entries between symmetric
+    positions; `compress_captures` searches capture runs as macro moves
+    (see `NegamaxSearch`). With `solve_edges` or fewer empty edges left the
+    position is solved exactly instead (`EndgameSolver`; 0 turns it off).
+    Greedy-phase positions found in `opening_book` are played from the
+    book (`models.book`; off by default, the shipped `data/opening.bin`
+    is only a placeholder). With `ponder` the late game
+    keeps searching the opponent's likely replies between moves
+    (`models.ponder`).
     """
 
-    def __init__(self, search_depth: int = 5, RATIO = 0.2) -> None:
+    # parameterized variants entered by `tournament.py`
+    VARIANTS = [{"solve_edges": 0}, {}, {"solve_edges": 16}]
+
+    def __init__(
+        self,
+        search_depth: int = 5,
+        RATIO = 0.5,
+        tt_size_log2: int = 16,
+        time_limit: float | None = None,
+        track_moves: bool = False,
+        symmetric_tt: bool = False,
+        compress_captures: bool = True,
+        solve_edges: int = 12,
+        opening_book: str | None = None,
+        ponder: bool = False,
+    ) -> None:
         self.RATIO = RATIO
         self.SEARCH_DEPTH = search_depth
+        self.TT_SIZE_LOG2 = tt_size_log2
+        self.TIME_LIMIT = time_limit
+        self.TRACK_MOVES = track_moves
+        self.SYMMETRIC_TT = symmetric_tt
+        self.COMPRESS_CAPTURES = compress_captures
+        self.SOLVE_EDGES = solve_edges
+        self.OPENING_BOOK = opening_book
+        self.PONDER = ponder
+        self.search: NegamaxSearch | None = None
+        self.solver: EndgameSolver | None = None
 
     def init(self) -> None:  # override base
-        pass
-
-    # ---------------- Helper methods (from main.py) ----------------
-    def _get_all_empty_moves(
-        self, board: list[list[list[int]]], xsize: int, ysize: int
-    ) -> list[list[int]]:
-        empty: list[list[int]] = []
-        for x in range(xsize):
-            for y in range(ysize + 1):
-                if board[x][y][0] == 0:
-                    empty.append([x, y, 0])
-        for x in range(xsize + 1):
-            for y in range(ysize):
-                if board[x][y][1] == 0:
-                    empty.append([x, y, 1])
-        return empty
-
-    def _get_adjacent_box_side_counts(
-        self, move: list[int], board: list[list[list[int]]], xsize: int, ysize: int
-    ) -> list[int]:
-        x, y, z = move
-        counts: list[int] = []
-        if z == 0:  # horizontal
-            if y > 0:
-                counts.append(
-                    board[x][y - 1][0] + board[x][y - 1][1] + board[x + 1][y - 1][1]
-                )
-            if y < ysize:
-                counts.append(board[x][y + 1][0] + board[x][y][1] + board[x + 1][y][1])
-        else:  # vertical
-            if x > 0:
-                counts.append(
-                    board[x - 1][y][1] + board[x - 1][y][0] + board[x - 1][y + 1][0]
-                )
-            if x < xsize:
-                counts.append(board[x + 1][y][1] + board[x][y][0] + board[x][y + 1][0])
-        return counts
+        super().init()
 
-    def _count_box_sides(self, board: list[list[list[int]]], x: int, y: int) -> int:
-        return board[x][y][0] + board[x][y + 1][0] + board[x][y][1] + board[x + 1][y][1]
-
-    def _get_completed_boxes_count(
-        self, board: list[list[list[int]]], move: list[int], xsize: int, ysize: int
-    ) -> int:
-        x, y, z = move
-        completed = 0
-        if z == 0:
-            if y > 0 and self._count_box_sides(board, x, y - 1) == 3:
-                completed += 1
-            if y < ysize and self._count_box_sides(board, x, y) == 3:
-                completed += 1
-        else:
-            if x > 0 and self._count_box_sides(board, x - 1, y) == 3:
-                completed += 1
-            if x < xsize and self._count_box_sides(board, x, y) == 3:
-                completed += 1
-        return completed
-
-    def _evaluate_heuristic(
-        self, board: list[list[list[int]]], xsize: int, ysize: int
-    ) -> int:
-        score = 0
-        for x in range(xsize):
-            for y in range(ysize):
-                sides = self._count_box_sides(board, x, y)
-                if sides == 3:
-                    score += 100
-                elif sides == 2:
-                    score -= 50
-        return score
-
-    def _get_move_score(
-        self, move: list[int], board: list[list[list[int]]], xsize: int, ysize: int
-    ) -> int:
-        counts = self._get_adjacent_box_side_counts(move, board, xsize, ysize)
-        if 3 in counts:
-            return 100
-        if 2 in counts:
-            return -100
-        return 0
-
-    def _negamax_undo(
-        self,
-        board: list[list[list[int]]],
-        depth: int,
-        alpha: float,
-        beta: float,
-        xsize: int,
-        ysize: int,
-    ) -> float:
-        if depth == 0:
-            return self._evaluate_heuristic(board, xsize, ysize)
-        moves = self._get_all_empty_moves(board, xsize, ysize)
-        if not moves:
-            return 0
-        moves.sort(
-            key=lambda m: self._get_move_score(m, board, xsize, ysize), reverse=True
-        )
-        best = -float("inf")
-        for mv in moves:
-            x, y, z = mv
-            completed = self._get_completed_boxes_count(board, mv, xsize, ysize)
-            board[x][y][z] = 1
-            if completed > 0:
-                val = completed + self._negamax_undo(
-                    board, depth - 1, alpha, beta, xsize, ysize
-                )
-            else:
-                val = -self._negamax_undo(board, depth - 1, -beta, -alpha, xsize, ysize)
-            board[x][y][z] = 0
-            if val > best:
-                best = val
-            alpha = max(alpha, best)
-            if alpha >= beta:
-                break
-        return best
+    def on_game_start(self, player: int, xsize: int, ysize: int) -> None:
+        super().on_game_start(player, xsize, ysize)
+        # nothing searched in an earlier game may steer this one
+        self.stop_pondering()
+        if self.ponderer is not None:
+            self.ponderer.results = {}
+        if self.search is not None:
+            self.search.new_game()
+        if self.solver is not None:
+            self.solver.new_game()
 
     # ------------------------ Public API --------------------------
     def run(
         self, board_lines: list[list[list[int]]], xsize: int, ysize: int
     ) -> list[int]:
-        moves = self._get_all_empty_moves(board_lines, xsize, ysize)
-        if not moves:
+        start = time.perf_counter()
+        geo = get_geometry(xsize, ysize)
+        if self.TRACK_MOVES:
+            tracker = self.track(board_lines, xsize, ysize)
+            bits = tracker.bits
+            num_empty = len(tracker.empty)
+        else:
+            bits = geo.pack(board_lines)
+            num_empty = geo.num_edges - bits.bit_count()
+        pondered = self.ponderer.move(bits) if self.ponderer is not None else None
+        if not num_empty:
+            self.stats = {}
             return [0, 0, 0]
-        total_possible = (xsize * (ysize + 1)) + (ysize * (xsize + 1))
-        # Greedy phase (>20% moves left)
-        if len(moves) > total_possible * self.RATIO:
-            winning: list[list[int]] = []
-            safe: list[list[int]] = []
-            unsafe: list[list[int]] = []
-            for mv in moves:
-                counts = self._get_adjacent_box_side_counts(
-                    mv, board_lines, xsize, ysize
-                )
-                if 3 in counts:
-                    winning.append(mv)
-                elif 2 in counts:
-                    unsafe.append(mv)
-                else:
-                    safe.append(mv)
+        # Endgame: solved exactly
+        if num_empty <= self.SOLVE_EDGES:
+            if self.solver is None or self.solver.geo is not geo:
+                self.solver = EndgameSolver(geo)
+            moves = geo.empty_edges(bits)
+            moves.sort(key=lambda e: geo.move_score(bits, e), reverse=True)
+            best_move, _ = self.solver.best_move(bits, moves)
+            self.stats = {"phase": "solve", "nodes": self.solver.solved}
+            return geo.move_of(best_move)
+        # Greedy phase (>50% moves left)
+        if num_empty > geo.num_edges * self.RATIO:
+            self.stats = {"phase": "greedy"}
+            if self.TRACK_MOVES:
+                winning = tracker.winning.items
+                safe = tracker.safe.items
+                unsafe = tracker.unsafe.items
+            else:
+                winning, safe, unsafe = geo.classify(bits)
             if winning:
-                x, y, z = random.choice(winning)
-                return [x, y, z]
-            if safe:
-                x, y, z = random.choice(safe)
-                return [x, y, z]
-            if unsafe:
-                x, y, z = random.choice(unsafe)
-                return [x, y, z]
-            x, y, z = random.choice(moves)
-            return [x, y, z]
+                return geo.move_of(random.choice(winning))
+            edge = self.book_move(bits, xsize, ysize)
+            if edge is not None:
+                self.stats = {"phase": "book"}
+            elif safe:
+                edge = random.choice(safe)
+            else:
+                edge = random.choice(unsafe)
+            # the next position may already be a search position
+            return self._play(geo, bits, edge)
         # Late game: Negamax search
-        board_copy = [[[v for v in z] for z in y] for y in board_lines]
-        moves.sort(
-            key=lambda m: self._get_move_score(m, board_lines, xsize, ysize),
-            reverse=True,
-        )
-        best_move = moves[0]
-        best_eval = -float("inf")
-        alpha = -float("inf")
-        beta = float("inf")
-        for mv in moves:
-            x, y, z = mv
-            completed = self._get_completed_boxes_count(board_copy, mv, xsize, ysize)
-            board_copy[x][y][z] = 1
-            if completed > 0:
-                val = completed + self._negamax_undo(
-                    board_copy, self.SEARCH_DEPTH - 1, alpha, beta, xsize, ysize
-                )
+        search = self._get_search(geo)
+        if self.TIME_LIMIT is None and pondered is not None:
+            # searched on the opponent's time (to the same depth)
+            best_move = pondered
+            self.stats = {"phase": "ponder", "pondered": self.ponderer.pondered}
+        else:
+            moves = geo.empty_edges(bits)
+            moves.sort(key=lambda e: geo.move_score(bits, e), reverse=True)
+            if self.TIME_LIMIT is None:
+                best_move, _ = search.search(bits, moves, self.SEARCH_DEPTH)
             else:
-                val = -self._negamax_undo(
-                    board_copy, self.SEARCH_DEPTH - 1, -beta, -alpha, xsize, ysize
-                )
-            board_copy[x][y][z] = 0
-            if val > best_eval:
-                best_eval = val
-                best_move = mv
-            alpha = max(alpha, best_eval)
-        return best_move
+                best_move, _ = search.search_until(bits, moves, start + self.TIME_LIMIT)
+            self.stats = {"phase": "negamax", **search.counters()}
+        return self._play(geo, bits, best_move)
+
+    def _get_search(self, geo: BoardGeometry) -> NegamaxSearch:
+        if self.search is None or self.search.geo is not geo:
+            symmetry = get_symmetry(geo.xsize, geo.ysize) if self.SYMMETRIC_TT else None
+            self.search = NegamaxSearch(
+                geo, self.TT_SIZE_LOG2, symmetry, self.COMPRESS_CAPTURES
+            )
+        return self.search
+
+    def _play(self, geo: BoardGeometry, bits: int, edge: int) -> list[int]:
+        """`edge` as a move. With `ponder`, searching goes on with the
+        opponent's replies to it (unless it takes a box: we move again)."""
+        if self.PONDER and not geo.completed_by(bits, edge):
+            search = self._get_search(geo)
+            if self.ponderer is None or self.ponderer.search is not search:
+                self.ponderer = Ponderer(search, self.SEARCH_DEPTH, self._search_moves)
+            self.ponderer.ponder_replies(bits | (1 << edge))
+        return geo.move_of(edge)
+
+    def _search_moves(self, bits: int) -> list[int] | None:
+        """Ordered root moves `run` would search on `bits`, or None if it
+        wouldn't search there (for `Ponderer`)."""
+        assert self.search is not None
+        geo = self.search.geo
+        num_empty = geo.num_edges - bits.bit_count()
+        if num_empty <= self.SOLVE_EDGES or num_empty > geo.num_edges * self.RATIO:
+            return None
+        moves = geo.empty_edges(bits)
+        moves.sort(key=lambda e: geo.move_score(bits, e), reverse=True)
+        return moves
@@ -0,0 +1,299 @@
+class BoardGeometry:
+    """Packed-integer view of an `xsize` x `ysize` dots and boxes board.
+
+    Edges are numbered in the order the models have always scanned them:
+    horizontal lines `[x, y, 0]` first (x outer, y inner), then vertical
+    lines `[x, y, 1]`. Bit `e` of a packed board is set when edge `e` is
+    drawn, so a whole 5x5 position (60 edges) fits in one int.
+    """
+
+    def __init__(self, xsize: int, ysize: int) -> None:
+        self.xsize = xsize
+        self.ysize = ysize
+
+        # edge index <-> [x, y, z]
+        self.edges: list[tuple[int, int, int]] = []
+        self.edge_index = [
+            [[-1, -1] for _ in range(ysize + 1)] for _ in range(xsize + 1)
+        ]
+        for x in range(xsize):
+            for y in range(ysize + 1):
+                self.edge_index[x][y][0] = len(self.edges)
+                self.edges.append((x, y, 0))
+        for x in range(xsize + 1):
+            for y in range(ysize):
+                self.edge_index[x][y][1] = len(self.edges)
+                self.edges.append((x, y, 1))
+        self.num_edges = len(self.edges)
+        self.full_mask = (1 << self.num_edges) - 1
+
+        # box index (x * ysize + y) -> mask of its 4 sides
+        self.num_boxes = xsize * ysize
+        self.box_xy: list[tuple[int, int]] = []
+        self.box_edges: list[tuple[int, int, int, int]] = []
+        self.box_mask: list[int] = []
+        for x in range(xsize):
+            for y in range(ysize):
+                sides = (
+                    self.edge_index[x][y][0],
+                    self.edge_index[x][y + 1][0],
+                    self.edge_index[x][y][1],
+                    self.edge_index[x + 1][y][1],
+                )
+                self.box_xy.append((x, y))
+                self.box_edges.append(sides)
+                self.box_mask.append(sum(1 << e for e in sides))
+
+        # edge -> boxes it borders (1 on the rim, 2 inside)
+        self.edge_boxes: list[tuple[int, ...]] = []
+        for x, y, z in self.edges:
+            boxes = []
+            if z == 0:
+                if y > 0:
+                    boxes.append(x * ysize + (y - 1))
+                if y < ysize:
+                    boxes.append(x * ysize + y)
+            else:
+                if x > 0:
+                    boxes.append((x - 1) * ysize + y)
+                if x < xsize:
+                    boxes.append(x * ysize + y)
+            self.edge_boxes.append(tuple(boxes))
+
+        # box -> ((neighbour box, shared edge), ...) for grid neighbours
+        neighbours: list[list[tuple[int, int]]] = [[] for _ in range(self.num_boxes)]
+        for e, boxes in enumerate(self.edge_boxes):
+            if len(boxes) == 2:
+                a, b = boxes
+                neighbours[a].append((b, e))
+                neighbours[b].append((a, e))
+        self.box_neighbours: list[tuple[tuple[int, int], ...]] = [
+            tuple(n) for n in neighbours
+        ]
+
+        # edge -> side masks of the boxes it borders
+        self.edge_box_masks: list[tuple[int, ...]] = [
+            tuple(self.box_mask[b] for b in boxes) for boxes in self.edge_boxes
+        ]
+
+    # ---------------- nested list <-> packed ----------------
+    def pack(self, board_lines: "list[list[list[int]]] | BoardView") -> int:
+        if isinstance(board_lines, BoardView):
+            return board_lines.bits
+        bits = 0
+        for e, (x, y, z) in enumerate(self.edges):
+            if board_lines[x][y][z]:
+                bits |= 1 << e
+        return bits
+
+    def unpack(self, bits: int) -> list[list[list[int]]]:
+        board = [[[0, 0] for _ in range(self.ysize + 1)] for _ in range(self.xsize + 1)]
+        for e, (x, y, z) in enumerate(self.edges):
+            if bits >> e & 1:
+                board[x][y][z] = 1
+        return board
+
+    def edge_of(self, move: list[int]) -> int:
+        """Edge index of `move`, or -1 if it is not on the board."""
+        x, y, z = move
+        if 0 <= x <= self.xsize and 0 <= y <= self.ysize and z in (0, 1):
+            return self.edge_index[x][y][z]
+        return -1
+
+    def move_of(self, edge: int) -> list[int]:
+        x, y, z = self.edges[edge]
+        return [x, y, z]
+
+    # ---------------- queries on a packed board ----------------
+    def empty_edges(self, bits: int) -> list[int]:
+        empty: list[int] = []
+        free = self.full_mask & ~bits
+        while free:
+            low = free & -free
+            empty.append(low.bit_length() - 1)
+            free ^= low
+        return empty
+
+    def box_sides(self, bits: int, box: int) -> int:
+        return (bits & self.box_mask[box]).bit_count()
+
+    def side_counts(self, bits: int, edge: int) -> list[int]:
+        """Drawn sides of each box next to `edge` (same as the old
+        `_get_adjacent_box_side_counts` for an empty edge)."""
+        return [(bits & m).bit_count() for m in self.edge_box_masks[edge]]
+
+    def completed_by(self, bits: int, edge: int) -> int:
+        """Number of boxes `edge` would complete on `bits`."""
+        completed = 0
+        for m in self.edge_box_masks[edge]:
+            if (bits & m).bit_count() == 3:
+                completed += 1
+        return completed
+
+    def move_score(self, bits: int, edge: int) -> int:
+        """Move-ordering score: +100 captures, -100 hands out a box, 0 safe."""
+        counts = self.side_counts(bits, edge)
+        if 3 in counts:
+            return 100
+        if 2 in counts:
+            return -100
+        return 0
+
+    def classify(self, bits: int) -> tuple[list[int], list[int], list[int]]:
+        """Split the empty edges into (winning, safe, unsafe) lists."""
+        winning: list[int] = []
+        safe: list[int] = []
+        unsafe: list[int] = []
+        for e in self.empty_edges(bits):
+            counts = self.side_counts(bits, e)
+            if 3 in counts:
+                winning.append(e)
+            elif 2 in counts:
+                unsafe.append(e)
+            else:
+                safe.append(e)
+        return winning, safe, unsafe
+
+    # ---------------- capture runs (macro moves of the searches) ----------------
+    def decline_edge(self, bits: int, box: int, e: int) -> int:
+        """The line that declines capturable `box` (open side `e`), or -1 if
+        taking it can't be wrong.
+
+        Walks the chain the box starts. Declining only pays at the end of a
+        capture: when exactly 2 boxes of a chain (draw the far side of the
+        second) or 4 of an opened loop (draw the middle line) are left.
+        """
+        box_mask = self.box_mask
+        prev, edge, length = box, e, 1
+        first_far = -1
+        while True:
+            nxt = -1
+            for b in self.edge_boxes[edge]:
+                if b != prev:
+                    nxt = b
+            if nxt < 0:
+                sides = 0
+            else:
+                sides = (bits & box_mask[nxt]).bit_count()
+            if sides == 3:
+                # both ends capturable: an opened loop (or one line for two)
+                return first_far if length == 3 else -1
+            if sides != 2:
+                return first_far if length == 2 else -1
+            length += 1
+            if length > 3:
+                return -1
+            far = box_mask[nxt] & ~bits & ~(1 << edge)
+            edge = far.bit_length() - 1
+            if length == 2:
+                first_far = edge
+            prev = nxt
+
+    def capture_runs(self, bits: int) -> list[tuple[int, int, bool]]:
+        """Macro moves of a position with boxes to take, as `(bits after,
+        boxes taken, turn kept)`; empty if there is nothing to take.
+
+        Boxes that can't be wrong to take are taken straight away. That
+        leaves one macro move (everything taken, move again), or a choice
+        at the end of a chain or loop: take the next box, or decline and
+        hand the last 2 / 4 boxes over.
+        """
+        box_mask = self.box_mask
+        taken = 0
+        start = bits
+        while True:
+            choice = None
+            forced = -1
+            for box, m in enumerate(box_mask):
+                if (bits & m).bit_count() != 3:
+                    continue
+                e = (m & ~bits).bit_length() - 1
+                g = self.decline_edge(bits, box, e)
+                if g < 0:
+                    forced = e
+                    break
+                if choice is None:
+                    choice = (e, g)
+            if forced >= 0:
+                taken += self.completed_by(bits, forced)
+                bits |= 1 << forced
+                continue
+            if choice is None:
+                return [(bits, taken, True)] if bits != start else []
+            e, g = choice
+            return [
+                (bits | 1 << e, taken + self.completed_by(bits, e), True),
+                (bits | 1 << g, taken, False),
+            ]
+
+    def heuristic(self, bits: int) -> int:
+        """V4.2 leaf evaluation: +100 per 3-sided box, -50 per 2-sided box."""
+        score = 0
+        for m in self.box_mask:
+            sides = (bits & m).bit_count()
+            if sides == 3:
+                score += 100
+            elif sides == 2:
+                score -= 50
+        return score
+
+
+class BoardView:
+    """Read-only `board_lines` backed by a packed board.
+
+    Indexes like the nested list (`view[x][y][z]`, `len`, iteration), but
+    its rows are tuples, so a model can't draw on the referee's board.
+    The rows are unpacked once, on the first index, so models that read
+    `view[x][y][z]` in a loop cost about what they do on the list.
+    `BoardGeometry.pack` just returns `bits`, and `lines` is a flat
+    read-only buffer with one byte (0/1) per edge, in edge order.
+    """
+
+    __slots__ = ("geo", "bits", "_rows")
+
+    def __init__(self, geo: BoardGeometry, bits: int) -> None:
+        self.geo = geo
+        self.bits = bits
+        self._rows: tuple[tuple[tuple[int, int], ...], ...] | None = None
+
+    def __len__(self) -> int:
+        return self.geo.xsize + 1
+
+    def __getitem__(self, x):
+        rows = self._rows
+        if rows is None:
+            rows = self._rows = self._unpack()
+        return rows[x]
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def _unpack(self) -> tuple[tuple[tuple[int, int], ...], ...]:
+        bits = self.bits
+        return tuple(
+            tuple(
+                (
+                    bits >> h & 1 if h >= 0 else 0,
+                    bits >> v & 1 if v >= 0 else 0,
+                )
+                for h, v in column
+            )
+            for column in self.geo.edge_index
+        )
+
+    @property
+    def lines(self) -> memoryview:
+        bits = self.bits
+        return memoryview(bytes(bits >> e & 1 for e in range(self.geo.num_edges)))
+
+
+_GEOMETRIES: dict[tuple[int, int], BoardGeometry] = {}
+
+
+def get_geometry(xsize: int, ysize: int) -> BoardGeometry:
+    """Shared, lazily built tables for a board size."""
+    geometry = _GEOMETRIES.get((xsize, ysize))
+    if geometry is None:
+        geometry = BoardGeometry(xsize, ysize)
+        _GEOMETRIES[(xsize, ysize)] = geometry
+    return geometry
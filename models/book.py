@@ -0,0 +1,73 @@
+import mmap
+import os
+
+from models.symmetry import Symmetry, get_symmetry
+
+# data/opening.bin: magic, xsize, ysize, then fixed-size records sorted by
+# canonical board (see `OpeningBook`)
+BOOK_MAGIC = b"SCOB1"
+BOOK_HEADER = len(BOOK_MAGIC) + 2
+
+
+def book_record(symmetry: Symmetry, canonical: int, edge: int) -> bytes:
+    """One record: the canonical board, big-endian so records sort as
+    bytes, then the edge to play on it."""
+    return canonical.to_bytes(symmetry.num_bytes, "big") + bytes([edge])
+
+
+class OpeningBook:
+    """Moves for early positions, read straight from a memory-mapped file.
+
+    The file holds one record per canonical position (`Symmetry.canonical`)
+    in sorted order, so `move(bits)` is a binary search over the mapping:
+    opening the book reads only the header, and the pages it touches stay
+    in the OS cache instead of the process. Generated offline by
+    `opening_book.py` into `data/opening.bin`.
+    """
+
+    def __init__(self, path: str, data: mmap.mmap, symmetry: Symmetry) -> None:
+        self.path = path
+        self.data = data
+        self.symmetry = symmetry
+        self.key_size = symmetry.num_bytes
+        self.record_size = self.key_size + 1
+        self.size = (len(data) - BOOK_HEADER) // self.record_size
+
+    @classmethod
+    def open(cls, path: str = "data/opening.bin") -> "OpeningBook | None":
+        """The book in `path`, or None if it isn't there."""
+        if not os.path.exists(path) or os.path.getsize(path) <= BOOK_HEADER:
+            return None
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[: len(BOOK_MAGIC)] != BOOK_MAGIC:
+            data.close()
+            return None
+        xsize, ysize = data[len(BOOK_MAGIC)], data[len(BOOK_MAGIC) + 1]
+        return cls(path, data, get_symmetry(xsize, ysize))
+
+    # an mmap can't be pickled (e.g. to `Battle` workers): reopen the file
+    def __reduce__(self):
+        return (OpeningBook.open, (self.path,))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def move(self, bits: int) -> int | None:
+        """The book's edge for `bits`, or None if the position isn't in it."""
+        canonical, t = self.symmetry.canonical(bits)
+        key = canonical.to_bytes(self.key_size, "big")
+        data, size, key_size = self.data, self.record_size, self.key_size
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            at = BOOK_HEADER + mid * size
+            probe = data[at : at + key_size]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                edge = data[at + key_size]
+                return self.symmetry.from_canonical(edge, t)
+        return None
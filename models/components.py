@@ -0,0 +1,87 @@
+from models.bitboard import BoardGeometry
+
+
+class ComponentTracker:
+    """Chain/loop decomposition behind the impartial-phase nim-sum.
+
+    A component is a group of 2-sided boxes joined through drawn shared
+    sides. It counts as a chain (worth its size) when any of its boxes
+    borders a 3-sided box, otherwise as a loop (worth 1); the nim-sum is
+    the XOR of those values. This is what `Nimber`/`NimberH` always
+    computed with a full-board DFS per candidate move.
+
+    The decomposition is built once per turn. `nim_sum_after(edge)` then
+    only re-derives the components next to `edge` (the two boxes it
+    borders and their neighbours); everything else keeps its value.
+    """
+
+    def __init__(self, geo: BoardGeometry, bits: int) -> None:
+        self.geo = geo
+        self.bits = bits
+        self.sides = [(bits & m).bit_count() for m in geo.box_mask]
+        # box -> component id (-1 unless 2-sided); per component: boxes, value
+        self.label = [-1] * geo.num_boxes
+        self.members: list[list[int]] = []
+        self.values: list[int] = []
+        self.nim_sum = 0
+        for b in range(geo.num_boxes):
+            if self.sides[b] == 2 and self.label[b] < 0:
+                members, value = self._component(bits, self.sides, b)
+                for m in members:
+                    self.label[m] = len(self.values)
+                self.members.append(members)
+                self.values.append(value)
+                self.nim_sum ^= value
+
+    def _component(
+        self, bits: int, sides: list[int], start: int
+    ) -> tuple[list[int], int]:
+        """Members of the component holding 2-sided `start`, and its value."""
+        neighbours = self.geo.box_neighbours
+        members = [start]
+        seen = {start}
+        is_chain = False
+        i = 0
+        while i < len(members):
+            b = members[i]
+            i += 1
+            for n, e in neighbours[b]:
+                if sides[n] == 3:
+                    is_chain = True
+                elif sides[n] == 2 and n not in seen and bits >> e & 1:
+                    seen.add(n)
+                    members.append(n)
+        return members, len(members) if is_chain else 1
+
+    def nim_sum_after(self, edge: int) -> int:
+        """Nim-sum once `edge` is drawn, without rebuilding the board."""
+        geo = self.geo
+        bits = self.bits | (1 << edge)
+        touched = geo.edge_boxes[edge]
+
+        sides = self.sides
+        if touched:
+            sides = list(sides)
+            for b in touched:
+                sides[b] += 1
+
+        # every component that touches or borders the changed boxes
+        region = set(touched)
+        for b in touched:
+            for n, _ in geo.box_neighbours[b]:
+                region.add(n)
+        affected = {self.label[b] for b in region if self.label[b] >= 0}
+
+        nim_sum = self.nim_sum
+        seeds = list(touched)
+        for c in affected:
+            nim_sum ^= self.values[c]
+            seeds.extend(self.members[c])
+
+        visited: set[int] = set()
+        for b in seeds:
+            if sides[b] == 2 and b not in visited:
+                members, value = self._component(bits, sides, b)
+                visited.update(members)
+                nim_sum ^= value
+        return nim_sum
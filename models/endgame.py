@@ -0,0 +1,174 @@
+import os
+
+from models.bitboard import BoardGeometry
+
+# data/endgame.bin: magic, max boxes, then one int8 value per multiset
+ENDGAME_MAGIC = b"SCET1"
+
+# (sorted chain lengths, sorted loop lengths)
+Endgame = tuple[tuple[int, ...], tuple[int, ...]]
+
+
+def endgame_multisets(max_boxes: int) -> list[Endgame]:
+    """Every multiset of chains (length >= 1) and loops (even length >= 4)
+    with at most `max_boxes` boxes in total, in the table's fixed order."""
+    parts = [(n, False) for n in range(1, max_boxes + 1)]
+    parts += [(n, True) for n in range(4, max_boxes + 1, 2)]
+    out: list[Endgame] = []
+
+    def visit(i: int, budget: int, chains: tuple[int, ...], loops: tuple[int, ...]):
+        if i == len(parts):
+            out.append((chains, loops))
+            return
+        n, is_loop = parts[i]
+        count = 0
+        while count * n <= budget:
+            if is_loop:
+                visit(i + 1, budget - count * n, chains, loops + (n,) * count)
+            else:
+                visit(i + 1, budget - count * n, chains + (n,) * count, loops)
+            count += 1
+
+    visit(0, max_boxes, (), ())
+    return out
+
+
+def opening_value(n: int, is_loop: bool, rest: int) -> int:
+    """Net boxes for the player who opens a chain/loop of `n` boxes when the
+    remaining components are worth `rest` to whoever moves in them next.
+
+    The other player either takes everything and moves next, or keeps
+    control by taking all but 2 (chain) / 4 (loop) boxes. Chains of 1 or 2
+    (opened in the middle) leave no such choice.
+    """
+    take_all = -n - rest
+    if is_loop:
+        return min(take_all, 8 - n + rest)
+    if n <= 2:
+        return take_all
+    return min(take_all, 4 - n + rest)
+
+
+class EndgameTable:
+    """Values of simple loony endgames: positions made only of independent
+    chains and loops, with the player to move forced to open one.
+
+    `value(chains, loops)` is the net number of the remaining boxes the
+    player to move gets with perfect play. Generated offline by
+    `endgame_table.py` into `data/endgame.bin`.
+    """
+
+    def __init__(self, values: dict[Endgame, int], max_boxes: int) -> None:
+        self.values = values
+        self.max_boxes = max_boxes
+
+    @classmethod
+    def load(cls, path: str = "data/endgame.bin") -> "EndgameTable | None":
+        """The table in `path`, or None if it isn't there."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(ENDGAME_MAGIC):
+            return None
+        max_boxes = data[len(ENDGAME_MAGIC)]
+        body = data[len(ENDGAME_MAGIC) + 1 :]
+        keys = endgame_multisets(max_boxes)
+        if len(body) != len(keys):
+            return None
+        signed = [v - 256 if v > 127 else v for v in body]
+        return cls(dict(zip(keys, signed)), max_boxes)
+
+    def value(self, chains: tuple[int, ...], loops: tuple[int, ...]) -> int | None:
+        return self.values.get((chains, loops))
+
+    def best_opening(
+        self, chains: tuple[int, ...], loops: tuple[int, ...]
+    ) -> tuple[int, bool, int] | None:
+        """(length, is_loop, value) of the best component to open, or None
+        if the position is not in the table."""
+        best = None
+        for comps, is_loop in ((chains, False), (loops, True)):
+            for i, n in enumerate(comps):
+                if i > 0 and comps[i - 1] == n:
+                    continue
+                rest_chains = chains if is_loop else chains[:i] + chains[i + 1 :]
+                rest_loops = loops[:i] + loops[i + 1 :] if is_loop else loops
+                rest = self.value(rest_chains, rest_loops)
+                if rest is None:
+                    return None
+                val = opening_value(n, is_loop, rest)
+                if best is None or val > best[2]:
+                    best = (n, is_loop, val)
+        return best
+
+
+def simple_components(
+    geo: BoardGeometry, bits: int
+) -> list[tuple[list[int], bool]] | None:
+    """Chains and loops of `bits` as (boxes in order, is_loop), or None if
+    some unfinished box doesn't have exactly 2 sides (not a simple
+    endgame). A chain's boxes run from one end to the other."""
+    sides = [(bits & m).bit_count() for m in geo.box_mask]
+    if any(s != 2 and s != 4 for s in sides):
+        return None
+
+    # 2-sided box -> its neighbours through open shared sides
+    links: list[list[int]] = [[] for _ in range(geo.num_boxes)]
+    for b in range(geo.num_boxes):
+        if sides[b] == 2:
+            for n, e in geo.box_neighbours[b]:
+                if not bits >> e & 1:
+                    links[b].append(n)
+
+    components = []
+    seen = [False] * geo.num_boxes
+    for b in range(geo.num_boxes):
+        if sides[b] != 2 or seen[b] or len(links[b]) == 2:
+            continue
+        # a chain end: walk to the other end
+        boxes = [b]
+        seen[b] = True
+        prev, cur = -1, b
+        while True:
+            nxt = [n for n in links[cur] if n != prev]
+            if not nxt:
+                break
+            prev, cur = cur, nxt[0]
+            seen[cur] = True
+            boxes.append(cur)
+        components.append((boxes, False))
+    for b in range(geo.num_boxes):
+        if sides[b] != 2 or seen[b]:
+            continue
+        # everything left is on a loop
+        boxes = [b]
+        seen[b] = True
+        prev, cur = -1, b
+        while True:
+            nxt = [n for n in links[cur] if n != prev and not seen[n]]
+            if not nxt:
+                break
+            prev, cur = cur, nxt[0]
+            seen[cur] = True
+            boxes.append(cur)
+        components.append((boxes, True))
+    return components
+
+
+def opening_edge(geo: BoardGeometry, bits: int, boxes: list[int], is_loop: bool) -> int:
+    """The line that opens a component: the middle of a 2-chain (so the
+    other player can't decline it), otherwise an open side of its first
+    box that leads off the component (any side for a loop)."""
+    if not is_loop and len(boxes) == 2:
+        for n, e in geo.box_neighbours[boxes[0]]:
+            if n == boxes[1]:
+                return e
+    first = boxes[0]
+    inner = set(boxes)
+    for e in geo.box_edges[first]:
+        if bits >> e & 1:
+            continue
+        if is_loop or all(b == first or b not in inner for b in geo.edge_boxes[e]):
+            return e
+    return (geo.box_mask[first] & ~bits).bit_length() - 1
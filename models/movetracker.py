@@ -0,0 +1,100 @@
+from models.bitboard import BoardGeometry
+
+# move classes, as in the models' greedy phase
+WINNING = 0
+SAFE = 1
+UNSAFE = 2
+
+
+class EdgeSet:
+    """Edge indices with O(1) add, discard and `random.choice(s.items)`."""
+
+    def __init__(self) -> None:
+        self.items: list[int] = []
+        self.pos: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, edge: int) -> bool:
+        return edge in self.pos
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, edge: int) -> None:
+        if edge not in self.pos:
+            self.pos[edge] = len(self.items)
+            self.items.append(edge)
+
+    def discard(self, edge: int) -> None:
+        i = self.pos.pop(edge, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if last != edge:
+            self.items[i] = last
+            self.pos[last] = i
+
+
+class MoveTracker:
+    """Empty edges and their winning/safe/unsafe class, kept across turns.
+
+    `play(edge)` applies one drawn edge and re-classifies only the empty
+    sides of the (at most two) boxes it borders. `sync(board_lines)` diffs
+    a full board against the last one seen, and starts over when edges
+    have disappeared (a new game).
+    """
+
+    def __init__(self, geo: BoardGeometry, bits: int = 0) -> None:
+        self.geo = geo
+        self.reset(bits)
+
+    def reset(self, bits: int) -> None:
+        self.bits = bits
+        self.empty = EdgeSet()
+        self.classes = (EdgeSet(), EdgeSet(), EdgeSet())
+        self.winning, self.safe, self.unsafe = self.classes
+        self.edge_class = [-1] * self.geo.num_edges
+        for e in self.geo.empty_edges(bits):
+            self.empty.add(e)
+            self._classify(e)
+
+    def _classify(self, edge: int) -> None:
+        counts = self.geo.side_counts(self.bits, edge)
+        if 3 in counts:
+            cls = WINNING
+        elif 2 in counts:
+            cls = UNSAFE
+        else:
+            cls = SAFE
+        old = self.edge_class[edge]
+        if old != cls:
+            if old >= 0:
+                self.classes[old].discard(edge)
+            self.classes[cls].add(edge)
+            self.edge_class[edge] = cls
+
+    def play(self, edge: int) -> None:
+        if self.bits >> edge & 1:
+            return
+        self.bits |= 1 << edge
+        self.empty.discard(edge)
+        self.classes[self.edge_class[edge]].discard(edge)
+        self.edge_class[edge] = -1
+        box_edges = self.geo.box_edges
+        for b in self.geo.edge_boxes[edge]:
+            for f in box_edges[b]:
+                if not self.bits >> f & 1:
+                    self._classify(f)
+
+    def sync(self, board_lines: list[list[list[int]]]) -> None:
+        bits = self.geo.pack(board_lines)
+        if self.bits & ~bits:
+            self.reset(bits)
+            return
+        new = bits & ~self.bits
+        while new:
+            low = new & -new
+            self.play(low.bit_length() - 1)
+            new ^= low
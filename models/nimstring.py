@@ -0,0 +1,176 @@
+from models.bitboard import BoardGeometry
+
+# (normalized boxes, normalized open lines), see `NimstringEvaluator.key`
+ComponentKey = tuple[tuple[tuple[int, int], ...], tuple[tuple[int, int, int], ...]]
+
+
+class NimstringEvaluator:
+    """Exact nimstring (Grundy) values of strings-and-coins components.
+
+    A component is a group of unfinished boxes joined through open shared
+    lines; its open lines on the rim are strings to the ground. Its value
+    is the mex over cutting each open line, where a cut that offers boxes
+    is resolved by the other player taking them, and a loony cut (one the
+    other player could decline with a double-dealing move) is left out,
+    since it never wins. The value of a position is the XOR of its
+    components'.
+
+    Values are memoized by the component's shape, normalized for position
+    and the 8 board symmetries, so the same chain, loop or branched shape
+    anywhere on the board is computed once. In front of it, `seen` maps a
+    component's open lines (which pin it down on this board) straight to
+    its value, so a component met again is one dict lookup without
+    normalizing. Both keep at most `max_entries` items and drop the oldest
+    first. Components with more
+    than `max_lines` open lines are not evaluated (`value` returns None).
+    """
+
+    def __init__(
+        self, geo: BoardGeometry, max_entries: int = 1 << 16, max_lines: int = 24
+    ) -> None:
+        self.geo = geo
+        self.max_entries = max_entries
+        self.max_lines = max_lines
+        self.memo: dict[ComponentKey, int] = {}
+        self.seen: dict[int, int] = {}
+        self.evaluated = 0  # components computed (not found in the memo)
+
+    def components(self, bits: int) -> list[tuple[list[int], int]]:
+        """(boxes, mask of open lines) of every component of `bits`."""
+        geo = self.geo
+        seen = [False] * geo.num_boxes
+        out = []
+        for start, m in enumerate(geo.box_mask):
+            if seen[start] or bits & m == m:
+                continue
+            seen[start] = True
+            boxes = [start]
+            lines = 0
+            i = 0
+            while i < len(boxes):
+                b = boxes[i]
+                i += 1
+                lines |= geo.box_mask[b] & ~bits
+                for n, e in geo.box_neighbours[b]:
+                    if not seen[n] and not bits >> e & 1:
+                        seen[n] = True
+                        boxes.append(n)
+            out.append((boxes, lines))
+        return out
+
+    def key(self, boxes: list[int], lines: int) -> ComponentKey:
+        """The component's shape, the same wherever and however it sits."""
+        geo = self.geo
+        coords = [geo.box_xy[b] for b in boxes]
+        edges = []
+        while lines:
+            low = lines & -lines
+            lines ^= low
+            edges.append(geo.edges[low.bit_length() - 1])
+
+        best: ComponentKey | None = None
+        for swap in (False, True):
+            for sx in (1, -1):
+                for sy in (1, -1):
+                    # box (x, y) covers dots (x..x+1, y..y+1); map it by its
+                    # far corner so flipped boxes stay on whole coordinates
+                    bs = []
+                    for x, y in coords:
+                        u, v = (y, x) if swap else (x, y)
+                        bs.append((min(sx * u, sx * (u + 1)), min(sy * v, sy * (v + 1))))
+                    ls = []
+                    for x, y, z in edges:
+                        u, v, w = (y, x, 1 - z) if swap else (x, y, z)
+                        # horizontal (w=0) spans u..u+1 at v, vertical spans v..v+1
+                        if w == 0:
+                            ls.append((min(sx * u, sx * (u + 1)), sy * v, 0))
+                        else:
+                            ls.append((sx * u, min(sy * v, sy * (v + 1)), 1))
+                    ox = min(b[0] for b in bs)
+                    oy = min(b[1] for b in bs)
+                    shape = (
+                        tuple(sorted((x - ox, y - oy) for x, y in bs)),
+                        tuple(sorted((x - ox, y - oy, w) for x, y, w in ls)),
+                    )
+                    if best is None or shape < best:
+                        best = shape
+        assert best is not None
+        return best
+
+    def resolve(self, bits: int) -> int:
+        """`bits` once every offered box is taken, or -1 if the position was
+        loony (the taker could decline instead)."""
+        geo = self.geo
+        while True:
+            for box, m in enumerate(geo.box_mask):
+                if (bits & m).bit_count() == 3:
+                    e = (m & ~bits).bit_length() - 1
+                    if geo.decline_edge(bits, box, e) >= 0:
+                        return -1
+                    bits |= 1 << e
+                    break
+            else:
+                return bits
+
+    def value(self, bits: int) -> int | None:
+        """Nimstring value of a position with no box to take (None if a
+        component is too big to evaluate)."""
+        total = 0
+        for boxes, lines in self.components(bits):
+            v = self.component_value(boxes, lines)
+            if v is None:
+                return None
+            total ^= v
+        return total
+
+    def component_value(self, boxes: list[int], lines: int) -> int | None:
+        v = self.seen.get(lines)
+        if v is not None:
+            return v
+        key = self.key(boxes, lines)
+        v = self.memo.get(key)
+        if v is None:
+            v = self.evaluate(lines)
+            if v is None:
+                return None
+            self._remember(self.memo, key, v)
+        self._remember(self.seen, lines, v)
+        return v
+
+    def _remember(self, memo: dict, key: object, value: int) -> None:
+        if len(memo) >= self.max_entries:
+            del memo[next(iter(memo))]
+        memo[key] = value
+
+    def evaluate(self, lines: int) -> int | None:
+        """mex over cutting each of the component's open `lines`."""
+        if lines.bit_count() > self.max_lines:
+            return None
+        self.evaluated += 1
+
+        # the component alone: everything else on the board drawn
+        alone = self.geo.full_mask & ~lines
+        options = set()
+        free = lines
+        while free:
+            low = free & -free
+            free ^= low
+            after = self.resolve(alone | low)
+            if after < 0:
+                continue
+            v = self.value(after)
+            if v is None:
+                return None
+            options.add(v)
+        v = 0
+        while v in options:
+            v += 1
+        return v
+
+    def move_value(self, bits: int, edge: int) -> int | None:
+        """Value the other player faces after `edge` and any boxes it offers
+        are taken; -1 for a loony move, None if too big to evaluate."""
+        after = self.resolve(bits | (1 << edge))
+        if after < 0:
+            return -1
+        return self.value(after)
@@ -0,0 +1,107 @@
+import threading
+from typing import Callable, Iterator
+
+from models.search import NegamaxSearch, SearchTimeout
+
+
+class Ponderer:
+    """Searches on the opponent's time, on a background thread.
+
+    After a model returns a move, `ponder_replies(bits)` goes through the
+    positions the opponent's likely replies leave it (`next_positions`)
+    and searches each with the model's own `search`. Everything it finds lands in the
+    shared transposition table; a reply searched to the end also leaves
+    its best move in `results`. `move(bits)` stops the thread (at the
+    search's next clock check) and returns the pondered move for the board
+    that actually came, if there is one.
+
+    `candidates(bits)` gives the ordered root moves the model would search
+    on `bits`, or None if it wouldn't search there (so it's not pondered).
+    The thread and the model never use the search at the same time: every
+    `run()` stops pondering before searching.
+    """
+
+    def __init__(
+        self,
+        search: NegamaxSearch,
+        depth: int,
+        candidates: Callable[[int], list[int] | None],
+    ) -> None:
+        self.search = search
+        self.depth = depth
+        self.candidates = candidates
+        self.results: dict[int, int] = {}
+        self.pondered = 0  # positions searched to the end by the last pondering
+        self.thread: threading.Thread | None = None
+        self.stopping = threading.Event()
+
+    def ponder_replies(self, bits: int) -> None:
+        """Start pondering the replies to `bits` (the opponent to move)."""
+        self.stop()
+        self.results = {}
+        self.pondered = 0
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, args=(bits,), daemon=True)
+        self.thread.start()
+
+    def next_positions(self, bits: int) -> Iterator[int]:
+        """Boards we may be asked to move on after the opponent's turn at
+        `bits`, most likely first. Boxes on offer are taken as the macro
+        moves of `BoardGeometry.capture_runs` (the order of a capture run
+        doesn't change the board it ends on); otherwise each reply gives
+        one board, best `move_score` first."""
+        geo = self.search.geo
+        runs = geo.capture_runs(bits)
+        if runs:
+            for child, _, keep_turn in runs:
+                if keep_turn:
+                    yield from self.next_positions(child)
+                else:
+                    yield child
+            return
+        replies = geo.empty_edges(bits)
+        replies.sort(key=lambda e: geo.move_score(bits, e), reverse=True)
+        for r in replies:
+            yield bits | (1 << r)
+
+    def _run(self, bits: int) -> None:
+        for child in self.next_positions(bits):
+            if self.stopping.is_set():
+                return
+            if child in self.results:
+                continue
+            moves = self.candidates(child)
+            if not moves:
+                continue
+            try:
+                best, _ = self.search.search(child, moves, self.depth)
+            except SearchTimeout:
+                return
+            self.results[child] = best
+            self.pondered += 1
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.search.abort()
+        self.thread.join()
+        self.thread = None
+        self.search.deadline = None
+
+    def move(self, bits: int) -> int | None:
+        """Stop pondering; the pondered best move for `bits`, if any."""
+        self.stop()
+        return self.results.get(bits)
+
+    # threads and events can't be pickled (e.g. to `Battle` workers)
+    def __getstate__(self) -> dict:
+        self.stop()
+        state = dict(self.__dict__)
+        del state["thread"], state["stopping"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.thread = None
+        self.stopping = threading.Event()
@@ -0,0 +1,414 @@
+import random
+import time
+
+from models.bitboard import BoardGeometry
+from models.symmetry import Symmetry
+
+# transposition table bound types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# table index of a canonical board (Fibonacci hashing; the incremental
+# Zobrist hash can't follow a position into its canonical form)
+CANONICAL_HASH_MULT = 0x9E3779B97F4A7C15
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search once the per-move deadline has passed."""
+
+
+class TranspositionTable:
+    """Fixed-size table of negamax results, indexed by a Zobrist hash.
+
+    Each slot holds one `(bits, depth, flag, value, move, generation)`
+    tuple. The packed board is stored alongside so an index collision can
+    never return another position's result. A slot is overwritten when the
+    new result is at least as deep, or when the old one is from an earlier
+    `new_search()` generation, so the table stays bounded and fresh.
+    """
+
+    def __init__(self, num_edges: int, size_log2: int = 16) -> None:
+        # private RNG: fixed keys, and the models' global `random` is untouched
+        rng = random.Random(0x5EED)
+        self.keys = [rng.getrandbits(64) for _ in range(num_edges)]
+        self.mask = (1 << size_log2) - 1
+        self.slots: list[tuple[int, int, int, float, int, int] | None] = [
+            None
+        ] * (1 << size_log2)
+        self.generation = 0
+
+    def hash(self, bits: int) -> int:
+        h = 0
+        while bits:
+            low = bits & -bits
+            h ^= self.keys[low.bit_length() - 1]
+            bits ^= low
+        return h
+
+    def new_search(self) -> None:
+        self.generation += 1
+
+    def clear(self) -> None:
+        self.slots = [None] * (self.mask + 1)
+        self.generation = 0
+
+    def probe(
+        self, h: int, bits: int
+    ) -> tuple[int, int, int, float, int, int] | None:
+        entry = self.slots[h & self.mask]
+        if entry is not None and entry[0] == bits:
+            return entry
+        return None
+
+    def store(
+        self, h: int, bits: int, depth: int, flag: int, value: float, move: int
+    ) -> None:
+        i = h & self.mask
+        old = self.slots[i]
+        if (
+            old is None
+            or old[0] == bits
+            or old[5] != self.generation
+            or depth >= old[1]
+        ):
+            self.slots[i] = (bits, depth, flag, value, move, self.generation)
+
+
+class NegamaxSearch:
+    """Depth-limited negamax with alpha-beta over packed boards.
+
+    Shared by `V4b` and `NimberH`. Completing a box keeps the turn, so such
+    a child is added (with the window shifted by the boxes taken) instead
+    of negated. The transposition table is kept for the whole game (until
+    `new_game`), so results are reused across nodes and across `run()`
+    calls.
+
+    With `compress_captures`, a position with boxes to take only has macro
+    moves: take every box on offer (then move again), or take all but the
+    last 2 of a chain / 4 of a loop and hand those over with one more line
+    (double-dealing). Taking every other capturable box first is never
+    worse, so this drops the orderings of a capture run and the
+    "don't capture yet" moves from the tree. Macro moves cost one ply, and
+    a leaf with captures pending is searched on (quiescence) instead of
+    being scored mid-run.
+
+    With a `symmetry`, the table stores one entry per symmetry class: each
+    node is looked up under its canonical board (see `models.symmetry`),
+    and stored moves are kept in canonical coordinates.
+
+    Moves are tried TT move first, then by `move_score`, with ties broken
+    by two killer moves per remaining depth and a history table of edges
+    that caused cutoffs. Every move after the first is searched with a
+    null window (principal-variation search) and only re-searched when it
+    beats alpha. `search_until` opens each iteration with an aspiration
+    window around the previous iteration's value.
+    """
+
+    # the clock is only read every this many nodes (must be 2^k - 1)
+    CLOCK_CHECK_MASK = 1023
+
+    # half-width of the aspiration window (heuristic units: a 3-sided box is 100)
+    ASPIRATION_WINDOW = 100
+
+    def __init__(
+        self,
+        geo: BoardGeometry,
+        tt_size_log2: int = 16,
+        symmetry: Symmetry | None = None,
+        compress_captures: bool = True,
+    ) -> None:
+        self.geo = geo
+        self.tt = TranspositionTable(geo.num_edges, tt_size_log2)
+        self.symmetry = symmetry
+        self.compress_captures = compress_captures
+        self.deadline: float | None = None
+        self.nodes = 0
+        self.cutoffs = 0
+        self.tt_hits = 0
+        self.depth_reached = 0
+        # quiet moves that caused cutoffs: 2 killers per remaining depth,
+        # and a per-edge history score (depth^2 per cutoff)
+        self.killers = [[-1, -1] for _ in range(geo.num_edges + 1)]
+        self.history = [0] * geo.num_edges
+
+    def _ordered_moves(self, bits: int, tt_move: int, depth: int) -> list[int]:
+        geo = self.geo
+        history = self.history
+        killers = self.killers[depth]
+        moves = geo.empty_edges(bits)
+        moves.sort(
+            key=lambda e: (
+                (geo.move_score(bits, e) << 24)
+                + ((1 << 23) if e in killers else 0)
+                + history[e]
+            ),
+            reverse=True,
+        )
+        if tt_move >= 0:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def _record_cutoff(self, e: int, depth: int) -> None:
+        self.cutoffs += 1
+        killers = self.killers[depth]
+        if killers[0] != e:
+            killers[1] = killers[0]
+            killers[0] = e
+        # capped so it never outweighs the killer bonus
+        self.history[e] = min(self.history[e] + depth * depth, (1 << 23) - 1)
+
+    def negamax(
+        self, bits: int, h: int, depth: int, alpha: float, beta: float
+    ) -> float:
+        self.nodes += 1
+        if (
+            self.deadline is not None
+            and not self.nodes & self.CLOCK_CHECK_MASK
+            and time.perf_counter() >= self.deadline
+        ):
+            raise SearchTimeout
+
+        tt = self.tt
+        symmetry = self.symmetry
+        key, t = bits, 0
+        if symmetry is not None:
+            key, t = symmetry.canonical(bits)
+            h = key * CANONICAL_HASH_MULT >> 64
+        entry = tt.probe(h, key)
+        tt_move = -1
+        if entry is not None:
+            tt_move = entry[4]
+            if symmetry is not None and tt_move >= 0:
+                tt_move = symmetry.from_canonical(tt_move, t)
+            if entry[1] >= depth:
+                flag, value = entry[2], entry[3]
+                if (
+                    flag == EXACT
+                    or (flag == LOWER and value >= beta)
+                    or (flag == UPPER and value <= alpha)
+                ):
+                    self.tt_hits += 1
+                    return value
+
+        geo = self.geo
+        runs = geo.capture_runs(bits) if self.compress_captures else []
+        if runs:
+            return self._negamax_runs(bits, h, key, t, runs, depth, alpha, beta)
+        if depth <= 0:
+            return geo.heuristic(bits)
+        moves = self._ordered_moves(bits, tt_move, depth)
+        if not moves:
+            return 0
+
+        alpha_orig = alpha
+        best = -float("inf")
+        best_move = moves[0]
+        keys = tt.keys
+        for i, e in enumerate(moves):
+            completed = geo.completed_by(bits, e)
+            val = self._child_value(
+                bits | (1 << e), h ^ keys[e], completed, depth - 1, alpha, beta, i > 0
+            )
+            if val > best:
+                best = val
+                best_move = e
+            alpha = max(alpha, best)
+            if alpha >= beta:
+                if completed == 0:
+                    self._record_cutoff(e, depth)
+                else:
+                    self.cutoffs += 1
+                break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if symmetry is not None:
+            best_move = symmetry.to_canonical(best_move, t)
+        tt.store(h, key, depth, flag, best, best_move)
+        return best
+
+    def _child_value(
+        self,
+        child: int,
+        h: int,
+        completed: int,
+        depth: int,
+        alpha: float,
+        beta: float,
+        null_window: bool,
+    ) -> float:
+        """Value of a move (from the mover's side) that completed `completed`
+        boxes. With `null_window` it is first only tested against alpha, and
+        searched with the full window only if it beats it."""
+        if null_window and beta > alpha + 1:
+            val = self._child_value(child, h, completed, depth, alpha, alpha + 1, False)
+            if val <= alpha or val >= beta:
+                return val
+        if completed > 0:
+            return completed + self.negamax(
+                child, h, depth, alpha - completed, beta - completed
+            )
+        return -self.negamax(child, h, depth, -beta, -alpha)
+
+    def _negamax_runs(
+        self,
+        bits: int,
+        h: int,
+        key: int,
+        t: int,
+        runs: list[tuple[int, int, bool]],
+        depth: int,
+        alpha: float,
+        beta: float,
+    ) -> float:
+        """`negamax` over the macro moves of `geo.capture_runs`; past the depth
+        limit the search goes on at depth 0 until no captures are pending."""
+        tt = self.tt
+        child_depth = max(depth - 1, 0)
+        alpha_orig = alpha
+        best = -float("inf")
+        for i, (child, taken, keep_turn) in enumerate(runs):
+            child_h = h if self.symmetry is not None else h ^ tt.hash(child ^ bits)
+            if keep_turn:
+                val = self._child_value(
+                    child, child_h, taken, child_depth, alpha, beta, i > 0
+                )
+            else:
+                # a decline hands the turn over with `taken` boxes in hand
+                val = taken + self._child_value(
+                    child, child_h, 0, child_depth, alpha - taken, beta - taken, i > 0
+                )
+            if val > best:
+                best = val
+            alpha = max(alpha, best)
+            if alpha >= beta:
+                self.cutoffs += 1
+                break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        # no single edge to suggest for move ordering
+        tt.store(h, key, depth, flag, best, -1)
+        return best
+
+    def _search_root(
+        self,
+        bits: int,
+        h: int,
+        moves: list[int],
+        depth: int,
+        alpha: float = -float("inf"),
+        beta: float = float("inf"),
+    ) -> tuple[int, float]:
+        """Best of `moves` and its value. A value at or below `alpha` or at
+        or above `beta` is only a bound (the aspiration window failed)."""
+        tt = self.tt
+        best_move = moves[0]
+        best_eval = -float("inf")
+        for i, e in enumerate(moves):
+            completed = self.geo.completed_by(bits, e)
+            val = self._child_value(
+                bits | (1 << e), h ^ tt.keys[e], completed, depth - 1, alpha, beta, i > 0
+            )
+            if val > best_eval:
+                best_eval = val
+                best_move = e
+            alpha = max(alpha, best_eval)
+            if alpha >= beta:
+                break
+        return best_move, best_eval
+
+    def new_game(self) -> None:
+        """Forget everything learned in earlier games (models call it from
+        `on_game_start`), so a game's moves don't depend on which games
+        this searcher happened to play before."""
+        self.tt.clear()
+        self.history = [0] * self.geo.num_edges
+
+    def _start(self) -> None:
+        self.tt.new_search()
+        self.killers = [[-1, -1] for _ in range(self.geo.num_edges + 1)]
+        self.history = [v >> 1 for v in self.history]
+        self.nodes = 0
+        self.cutoffs = 0
+        self.tt_hits = 0
+
+    def counters(self) -> dict[str, int | str]:
+        """Counters of the last root search, for `DotsBoxModel.stats`."""
+        return {
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "tt_hits": self.tt_hits,
+            "depth": self.depth_reached,
+        }
+
+    def search(self, bits: int, moves: list[int], depth: int) -> tuple[int, float]:
+        """Best of `moves` (already ordered) at `depth`; ties keep the first."""
+        self._start()
+        best = self._search_root(bits, self.tt.hash(bits), moves, depth)
+        self.depth_reached = depth
+        return best
+
+    def abort(self) -> None:
+        """Make a running search (on another thread) raise `SearchTimeout`
+        at its next clock check."""
+        self.deadline = -float("inf")
+
+    def search_until(
+        self,
+        bits: int,
+        moves: list[int],
+        deadline: float,
+        max_depth: int | None = None,
+    ) -> tuple[int, float]:
+        """Iterative deepening over `moves` until `deadline` (perf_counter).
+
+        Each iteration starts from the previous iteration's best move, with
+        an `ASPIRATION_WINDOW` around its value (re-searched with the full
+        window if the value falls outside), and the result of the deepest
+        *completed* iteration is returned. Without
+        `max_depth` it deepens until the whole remaining game is searched.
+        If not even depth 1 finishes, the first of `moves` is returned.
+        """
+        self._start()
+        self.depth_reached = 0
+        h = self.tt.hash(bits)
+        if max_depth is None:
+            max_depth = len(self.geo.empty_edges(bits))
+
+        ordered = list(moves)
+        best: tuple[int, float] = (ordered[0], -float("inf"))
+        self.deadline = deadline
+        try:
+            for depth in range(1, max_depth + 1):
+                if depth == 1:
+                    result = self._search_root(bits, h, ordered, depth)
+                else:
+                    lower = best[1] - self.ASPIRATION_WINDOW
+                    upper = best[1] + self.ASPIRATION_WINDOW
+                    result = self._search_root(bits, h, ordered, depth, lower, upper)
+                    if not lower < result[1] < upper:
+                        # only a bound: it must not be returned if the
+                        # re-search times out
+                        result = self._search_root(bits, h, ordered, depth)
+                best = result
+                self.depth_reached = depth
+                ordered.remove(best[0])
+                ordered.insert(0, best[0])
+                if time.perf_counter() >= deadline:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+        return best
@@ -0,0 +1,79 @@
+from models.bitboard import BoardGeometry
+
+
+class EndgameSolver:
+    """Exact solver for positions with few empty edges.
+
+    `value(bits)` is the net number of the remaining boxes the player to
+    move gets with perfect play from both sides (boxes taken minus boxes
+    conceded). Positions are memoized by packed board; a position with k
+    empty edges has at most 2^k descendants, so below ~16 edges a full
+    solve is cheap. Capture runs are searched as the macro moves of
+    `BoardGeometry.capture_runs`, which keeps values exact.
+
+    The memo holds at most `max_entries` positions and is emptied when it
+    fills up or on `new_game`.
+    """
+
+    def __init__(self, geo: BoardGeometry, max_entries: int = 1 << 18) -> None:
+        self.geo = geo
+        self.max_entries = max_entries
+        self.memo: dict[int, int] = {}
+        self.solved = 0  # positions evaluated by the last `best_move`
+
+    def value(self, bits: int) -> int:
+        value = self.memo.get(bits)
+        if value is not None:
+            return value
+        self.solved += 1
+
+        geo = self.geo
+        runs = geo.capture_runs(bits)
+        best = -geo.num_boxes
+        if runs:
+            for child, taken, keep_turn in runs:
+                if keep_turn:
+                    val = taken + self.value(child)
+                else:
+                    val = taken - self.value(child)
+                if val > best:
+                    best = val
+        else:
+            free = geo.full_mask & ~bits
+            if not free:
+                best = 0
+            while free:
+                low = free & -free
+                free ^= low
+                # no box is capturable here, so no move completes one
+                val = -self.value(bits | low)
+                if val > best:
+                    best = val
+
+        if len(self.memo) >= self.max_entries:
+            self.memo.clear()
+        self.memo[bits] = best
+        return best
+
+    def new_game(self) -> None:
+        """Drop the last game's positions (models call it from
+        `on_game_start`); they're exact, but rarely come up again."""
+        self.memo.clear()
+
+    def best_move(self, bits: int, moves: list[int]) -> tuple[int, int]:
+        """Optimal edge among `moves` and its value; ties keep the first."""
+        self.solved = 0
+
+        geo = self.geo
+        best_move = moves[0]
+        best = -geo.num_boxes - 1
+        for e in moves:
+            completed = geo.completed_by(bits, e)
+            if completed > 0:
+                val = completed + self.value(bits | (1 << e))
+            else:
+                val = -self.value(bits | (1 << e))
+            if val > best:
+                best = val
+                best_move = e
+        return best_move, best
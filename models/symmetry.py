@@ -0,0 +1,133 @@
+from models.bitboard import BoardGeometry, get_geometry
+
+
+class Symmetry:
+    """Board symmetries acting on packed boards (see `models.bitboard`).
+
+    A square board has 8 (rotations and reflections), any other board 4.
+    Transform 0 is the identity. `canonical(bits)` is the smallest image
+    of `bits` under all of them, so every position of a symmetry class
+    maps to the same packed board; moves are carried across with
+    `to_canonical` / `from_canonical`.
+
+    All transforms are applied together with one lookup per byte of the
+    board: a table maps (byte position, byte value) to the images of those
+    8 edges under every transform, side by side in one int. Images of
+    different bytes never overlap, so the lookups just add up.
+    """
+
+    def __init__(self, geo: BoardGeometry) -> None:
+        self.geo = geo
+        xs, ys = geo.xsize, geo.ysize
+
+        # dot transforms on (x, y), 0 <= x <= xsize, 0 <= y <= ysize
+        dot_maps = [
+            lambda x, y: (x, y),
+            lambda x, y: (xs - x, y),
+            lambda x, y: (x, ys - y),
+            lambda x, y: (xs - x, ys - y),
+        ]
+        if xs == ys:
+            dot_maps += [
+                lambda x, y: (y, x),
+                lambda x, y: (ys - y, x),
+                lambda x, y: (y, xs - x),
+                lambda x, y: (ys - y, xs - x),
+            ]
+
+        # edge permutation of every transform: perms[t][e] = image of e
+        self.perms: list[list[int]] = []
+        for dot_map in dot_maps:
+            perm = []
+            for x, y, z in geo.edges:
+                a = dot_map(x, y)
+                b = dot_map(x + 1, y) if z == 0 else dot_map(x, y + 1)
+                if a[1] == b[1]:
+                    perm.append(geo.edge_index[min(a[0], b[0])][a[1]][0])
+                else:
+                    perm.append(geo.edge_index[a[0]][min(a[1], b[1])][1])
+            self.perms.append(perm)
+        self.num_transforms = len(self.perms)
+
+        identity = list(range(geo.num_edges))
+        self.inverse = [
+            next(
+                u
+                for u in range(self.num_transforms)
+                if [self.perms[u][e] for e in perm] == identity
+            )
+            for perm in self.perms
+        ]
+
+        # table[256 * k + v]: images of byte value v at byte position k under
+        # every transform at once, transform t in bits [t * width, (t + 1) * width)
+        self.width = geo.num_edges
+        self.lane_mask = (1 << self.width) - 1
+        self.num_bytes = (geo.num_edges + 7) // 8
+        self.offsets = [256 * k for k in range(self.num_bytes)]
+        self.table = [0] * (256 * self.num_bytes)
+        for k in range(self.num_bytes):
+            for v in range(1, 256):
+                low = v & -v
+                e = 8 * k + low.bit_length() - 1
+                images = 0
+                if e < geo.num_edges:
+                    for t, perm in enumerate(self.perms):
+                        images |= 1 << (perm[e] + t * self.width)
+                self.table[256 * k + v] = self.table[256 * k + (v ^ low)] | images
+
+    def images(self, bits: int) -> int:
+        """All images of `bits`, one `width`-bit lane per transform."""
+        return sum(
+            map(
+                self.table.__getitem__,
+                [
+                    o + v
+                    for o, v in zip(
+                        self.offsets, bits.to_bytes(self.num_bytes, "little")
+                    )
+                ],
+            )
+        )
+
+    def transform(self, bits: int, t: int) -> int:
+        return self.images(bits) >> (t * self.width) & self.lane_mask
+
+    def canonical(self, bits: int) -> tuple[int, int]:
+        """(canonical packed board, transform `t` that maps `bits` to it)."""
+        images = self.images(bits)
+        width, mask = self.width, self.lane_mask
+        best = bits
+        best_t = 0
+        for t in range(1, self.num_transforms):
+            image = images >> (t * width) & mask
+            if image < best:
+                best = image
+                best_t = t
+        return best, best_t
+
+    def canonical_board(self, board_lines: list[list[list[int]]]) -> tuple[int, int]:
+        return self.canonical(self.geo.pack(board_lines))
+
+    def to_canonical(self, edge: int, t: int) -> int:
+        """Edge of the canonical board that `edge` becomes under `t`."""
+        return self.perms[t][edge]
+
+    def from_canonical(self, edge: int, t: int) -> int:
+        """Edge of the original board for a canonical-board `edge`."""
+        return self.perms[self.inverse[t]][edge]
+
+    def move_from_canonical(self, edge: int, t: int) -> list[int]:
+        return self.geo.move_of(self.from_canonical(edge, t))
+
+
+_SYMMETRIES: dict[tuple[int, int], Symmetry] = {}
+
+
+def get_symmetry(xsize: int, ysize: int) -> Symmetry:
+    """Shared, lazily built symmetry tables for a board size."""
+    symmetry = _SYMMETRIES.get((xsize, ysize))
+    if symmetry is None:
+        symmetry = Symmetry(get_geometry(xsize, ysize))
+        _SYMMETRIES[(xsize, ysize)] = symmetry
+    return symmetry
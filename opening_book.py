@@ -0,0 +1,102 @@
+#! /usr/bin/env python
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import os.path
+
+from battle import Battle, derive_seed
+from models.book import BOOK_MAGIC, book_record
+from models.symmetry import get_symmetry
+from tournament import Entry
+
+# (canonical board, canonical edge) -> [games, summed margin for the mover]
+Tally = dict[tuple[int, int], list[int]]
+
+
+def _self_play(task: tuple[Entry, int, int, int]) -> Tally:
+    entry, games, plies, seed = task
+    players = [entry.build(), entry.build()]
+    for player in players:
+        # explore: the book being built must not steer its own games
+        player.book_loaded = True
+    battle = Battle(*players)
+    symmetry = get_symmetry(battle.xsize, battle.ysize)
+    geo = symmetry.geo
+
+    tally: Tally = {}
+    for i in range(games):
+        result = battle.battle(i % 2, derive_seed(seed, "book", i))
+        bits = 0
+        for turn, move in result.actions[:plies]:
+            canonical, t = symmetry.canonical(bits)
+            edge = geo.edge_of(move)
+            margin = result.score[turn] - result.score[1 - turn]
+            counts = tally.setdefault((canonical, symmetry.to_canonical(edge, t)), [0, 0])
+            counts[0] += 1
+            counts[1] += margin
+            bits |= 1 << edge
+    return tally
+
+
+def self_play(
+    entry: Entry, games: int, plies: int, workers: int, seed: int
+) -> Tally:
+    """Outcomes of the first `plies` moves of `games` self-play games."""
+    chunks = max(1, workers) * 4
+    tasks = [
+        (entry, games // chunks + (k < games % chunks), plies, derive_seed(seed, k))
+        for k in range(chunks)
+    ]
+    tally: Tally = {}
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        for part in pool.map(_self_play, tasks):
+            for key, (n, total) in part.items():
+                counts = tally.setdefault(key, [0, 0])
+                counts[0] += n
+                counts[1] += total
+    return tally
+
+
+def choose(tally: Tally, min_visits: int) -> dict[int, int]:
+    """Canonical board -> edge with the best mean margin, over moves
+    played at least `min_visits` times."""
+    best: dict[int, tuple[float, int]] = {}
+    for (canonical, edge), (n, total) in tally.items():
+        if n < min_visits:
+            continue
+        mean = total / n
+        if canonical not in best or mean > best[canonical][0]:
+            best[canonical] = (mean, edge)
+    return {canonical: edge for canonical, (_, edge) in best.items()}
+
+
+def write(path: str, book: dict[int, int], xsize: int, ysize: int) -> None:
+    symmetry = get_symmetry(xsize, ysize)
+    with open(path, "wb") as f:
+        f.write(BOOK_MAGIC + bytes([xsize, ysize]))
+        for canonical in sorted(book):
+            f.write(book_record(symmetry, canonical, book[canonical]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write the opening book read by V4b and NimberH from self-play"
+    )
+    parser.add_argument("--model", default="NimberH", help="model class to self-play")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--plies", type=int, default=8, help="book depth in moves")
+    parser.add_argument(
+        "--min-visits", type=int, default=40, help="games a book move needs"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="./data/opening.bin")
+    args = parser.parse_args()
+
+    entry = Entry(args.model, args.model)
+    tally = self_play(entry, args.games, args.plies, args.workers, args.seed)
+    book = choose(tally, args.min_visits)
+    write(args.out, book, 5, 5)
+    plies = Counter(canonical.bit_count() for canonical in book)
+    print(f"{len(book)} positions from {args.games} games -> {args.out}")
+    print("positions per ply: " + ", ".join(f"{k}: {plies[k]}" for k in sorted(plies)))
@@ -0,0 +1,105 @@
+import cProfile
+import os
+import pstats
+
+from models.DotsBoxModel import DotsBoxModel
+
+
+class BattleHook:
+    """Observer called by `Battle` around every model call.
+
+    `before_move` / `after_move` bracket exactly one `run()` (or one
+    `run_batch()` in `Battle.batch_interleaved`), so the referee's own work
+    is never inside them. Hooks run in the process that plays the game,
+    so `Battle` refuses them with `workers > 1`: pool workers would only
+    update their own pickled copies.
+    """
+
+    def before_move(self, turn: int, model: DotsBoxModel) -> None:
+        pass
+
+    def after_move(self, turn: int, model: DotsBoxModel, seconds: float) -> None:
+        pass
+
+
+class ModelProfiler(BattleHook):
+    """cProfile of the models' `run()` calls, aggregated per model.
+
+    * `players`: which seats to profile (e.g. `(0,)` for player 0 only)
+    * `slow_threshold`: keep only moves that took at least this many seconds
+    * `by_phase`: split each model's profile by its `stats["phase"]`
+      (NimberH: greedy / negamax / nim)
+
+    * `names`: a label per seat (e.g. tournament entry names); by default
+      `player<seat>-<model class>`, so two variants of one class in the
+      same battle get separate profiles
+
+    Profiles are keyed by seat label (plus `[phase]`) and keep
+    accumulating across games until `clear()`.
+    """
+
+    def __init__(
+        self,
+        players: tuple[int, ...] = (0, 1),
+        slow_threshold: float = 0.0,
+        by_phase: bool = False,
+        names: tuple[str, str] | None = None,
+    ) -> None:
+        self.players = players
+        self.names = names
+        self.slow_threshold = slow_threshold
+        self.by_phase = by_phase
+        self.stats: dict[str, pstats.Stats] = {}
+        self.samples: dict[str, int] = {}
+        self._profile: cProfile.Profile | None = None
+
+    def key(self, turn: int, model: DotsBoxModel) -> str:
+        if self.names is not None:
+            name = self.names[turn]
+        else:
+            name = f"player{turn}-{type(model).__name__}"
+        if self.by_phase and "phase" in model.stats:
+            return f"{name}[{model.stats['phase']}]"
+        return name
+
+    def before_move(self, turn: int, model: DotsBoxModel) -> None:
+        if turn not in self.players:
+            return
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def after_move(self, turn: int, model: DotsBoxModel, seconds: float) -> None:
+        profile = self._profile
+        if profile is None:
+            return
+        profile.disable()
+        self._profile = None
+        if seconds < self.slow_threshold:
+            return
+
+        key = self.key(turn, model)
+        if key in self.stats:
+            self.stats[key].add(profile)
+        else:
+            self.stats[key] = pstats.Stats(profile)
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+    def clear(self) -> None:
+        self.stats = {}
+        self.samples = {}
+
+    def print_stats(self, sort: str = "cumulative", limit: int = 20) -> None:
+        for key, stats in self.stats.items():
+            print(f"==== {key}: {self.samples[key]} moves ====")
+            stats.sort_stats(sort).print_stats(limit)
+
+    def dump(self, directory: str) -> list[str]:
+        """Write one `<key>.pstats` file per profile (for `pstats`,
+        snakeviz, gprof2dot, ...) and return their paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for key, stats in self.stats.items():
+            path = os.path.join(directory, f"{key}.pstats")
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from models.bitboard import get_geometry
+
+
+@dataclass
+class StepResult:
+    completed: np.ndarray  # (n_games,) boxes completed by this move
+    turn_changed: np.ndarray  # (n_games,) bool
+    game_over: np.ndarray  # (n_games,) bool, after this move
+
+
+class VectorReferee:
+    """Referee for many games at once, held as NumPy arrays.
+
+    Mirrors `Battle.try_move` / `is_over` for `n_games` boards in lockstep.
+    Moves are edge indices of `models.bitboard` (-1 = no move, for games
+    that are already over). Drawing an illegal edge forfeits the game
+    (`flag` 1), as in `Battle.battle`.
+    """
+
+    def __init__(self, n_games: int, xsize: int = 5, ysize: int = 5) -> None:
+        self.geo = get_geometry(xsize, ysize)
+        self.n_games = n_games
+        self.num_edges = self.geo.num_edges
+        self.num_boxes = self.geo.num_boxes
+
+        # edge -> its (up to) 2 boxes; missing boxes point at a dummy column
+        self.edge_boxes = np.full((self.num_edges, 2), self.num_boxes, dtype=np.intp)
+        for e, boxes in enumerate(self.geo.edge_boxes):
+            self.edge_boxes[e, : len(boxes)] = boxes
+
+        self.reset()
+
+    def reset(self, initial_turn: int | np.ndarray = 0) -> None:
+        n = self.n_games
+        self.lines = np.zeros((n, self.num_edges), dtype=bool)
+        # one extra always-empty column stands in for "no box"
+        self.sides = np.zeros((n, self.num_boxes + 1), dtype=np.int8)
+        self.turn = np.zeros(n, dtype=np.int8)
+        self.turn[:] = initial_turn
+        self.score = np.zeros((n, 2), dtype=np.int16)
+        self.over = np.zeros(n, dtype=bool)
+        self.flag = np.zeros(n, dtype=np.int8)
+        self.plies = np.zeros(n, dtype=np.int16)
+
+    def apply(self, moves: np.ndarray) -> StepResult:
+        """Play one move in every game; games that are over are skipped."""
+        n = self.n_games
+        rows = np.arange(n)
+        moves = np.asarray(moves, dtype=np.intp)
+        active = ~self.over
+
+        in_range = (moves >= 0) & (moves < self.num_edges)
+        safe_moves = np.where(in_range, moves, 0)
+        legal = in_range & ~self.lines[rows, safe_moves]
+        forfeit = active & ~legal
+        play = active & legal
+
+        self.lines[rows[play], safe_moves[play]] = True
+        completed = np.zeros(n, dtype=np.int16)
+        for k in (0, 1):
+            boxes = self.edge_boxes[safe_moves, k]
+            hit = play & (boxes != self.num_boxes)
+            self.sides[rows[hit], boxes[hit]] += 1
+            completed += hit & (self.sides[rows, boxes] == 4)
+        self.score[rows[play], self.turn[play]] += completed[play]
+        self.plies += play
+
+        # an invalid move loses on the spot
+        self.flag[forfeit] = 1
+        self.over |= forfeit
+
+        turn_changed = play & (completed == 0)
+        self.turn[turn_changed] ^= 1
+        self.over |= self.score.sum(axis=1) >= self.num_boxes
+        return StepResult(completed, turn_changed, self.over.copy())
+
+    def winners(self) -> np.ndarray:
+        """0 / 1, or -1 for a draw, as in `BattleResult.winner`."""
+        winner = np.where(
+            self.score[:, 0] > self.score[:, 1],
+            0,
+            np.where(self.score[:, 1] > self.score[:, 0], 1, -1),
+        )
+        # a forfeiting player loses whatever the score
+        return np.where(self.flag == 1, 1 - self.turn, winner)
+
+    # ---------------- vectorized policies ----------------
+    def side_counts(self) -> np.ndarray:
+        """(n_games, num_edges, 2) drawn sides of the boxes next to each edge."""
+        return self.sides[:, self.edge_boxes]
+
+    def random_moves(self, rng: np.random.Generator) -> np.ndarray:
+        """Randomix: a uniformly random empty edge per game."""
+        keys = rng.random((self.n_games, self.num_edges))
+        keys[self.lines] = -1.0
+        return keys.argmax(axis=1)
+
+    def greedy_moves(self, rng: np.random.Generator) -> np.ndarray:
+        """The V4b/NimberH greedy phase: a random winning move, else a random
+        safe move, else a random unsafe one."""
+        three = self.sides == 3
+        two = self.sides == 2
+        e0, e1 = self.edge_boxes[:, 0], self.edge_boxes[:, 1]
+        winning = three[:, e0] | three[:, e1]
+        unsafe = two[:, e0] | two[:, e1]
+        # rank 2 / 1 / 0 for winning / safe / unsafe, random within a rank
+        rank = 1 + winning.astype(np.int8) - (unsafe & ~winning)
+        keys = rank + rng.random((self.n_games, self.num_edges))
+        keys[self.lines] = -1.0
+        return keys.argmax(axis=1)
+
+
+def simulate(
+    n_games: int,
+    policies: tuple[str, str] = ("random", "greedy"),
+    initial_turn: int = 0,
+    seed: int | None = None,
+    xsize: int = 5,
+    ysize: int = 5,
+) -> VectorReferee:
+    """Play `n_games` between two vectorized policies ("random" or "greedy")
+    and return the finished referee (scores, winners(), plies, ...)."""
+    rng = np.random.default_rng(seed)
+    referee = VectorReferee(n_games, xsize, ysize)
+    referee.reset(initial_turn)
+    pick = {"random": referee.random_moves, "greedy": referee.greedy_moves}
+    while not referee.over.all():
+        if policies[0] == policies[1]:
+            moves = pick[policies[0]](rng)
+        else:
+            moves = np.where(
+                referee.turn == 0, pick[policies[0]](rng), pick[policies[1]](rng)
+            )
+        moves[referee.over] = -1
+        referee.apply(moves)
+    return referee
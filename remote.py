@@ -0,0 +1,177 @@
+import multiprocessing
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+import random
+import time
+
+from models.DotsBoxModel import DotsBoxModel
+from models.bitboard import BoardView, get_geometry
+
+# bytes of the shared board buffer: a packed board of up to 512 edges
+BOARD_BYTES = 64
+
+
+class MoveTimeout(Exception):
+    """A `RemoteModel` didn't answer within its per-move deadline."""
+
+
+def _serve(conn: Connection, model: DotsBoxModel, shm_name: str) -> None:
+    """Worker loop: run `model` on the boards the referee puts in shared
+    memory, and pass on its game notifications."""
+    shm = SharedMemory(name=shm_name)
+    try:
+        while True:
+            message = conn.recv()
+            kind = message[0]
+            if kind == "run":
+                _, xsize, ysize = message
+                geo = get_geometry(xsize, ysize)
+                bits = int.from_bytes(shm.buf[:BOARD_BYTES], "little")
+                t0 = time.perf_counter_ns()
+                move = model.run(BoardView(geo, bits), xsize, ysize)
+                seconds = (time.perf_counter_ns() - t0) / 1e9
+                conn.send((list(move), dict(model.stats), seconds))
+            elif kind == "move":
+                model.on_move(*message[1:])
+            elif kind == "start":
+                model.on_game_start(*message[1:])
+            elif kind == "seed":
+                random.seed(message[1])
+            elif kind == "ponder":
+                model.PONDER = message[1]
+                if not model.PONDER:
+                    model.stop_pondering()
+            elif kind == "unponder":
+                model.stop_pondering()
+            else:  # "stop"
+                return
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class RemoteModel(DotsBoxModel):
+    """A model running in its own persistent worker process.
+
+    The referee writes each packed board into a `SharedMemory` buffer and
+    only a short message goes through the pipe; the worker reads it as a
+    `BoardView`. `seconds` is the last move's time measured inside the
+    worker, so it's free of the referee's and the other model's overhead
+    (GC, GIL, IPC). A move that takes longer than `deadline` seconds
+    raises `MoveTimeout`, and the worker is replaced by a fresh copy of
+    `model` (its search state is lost), reseeded with the last `reseed`.
+
+    Setting `PONDER` (e.g. `Battle(ponder=...)`) turns pondering on or
+    off inside the worker, so the model ponders on its own process's
+    time, not the referee's or the opponent's.
+
+    `submit` / `collect` split `run` in two, so the referee can keep both
+    players' workers busy on different games (`Battle.batch_pipelined`).
+    Call `close()` (or use `with`) to stop the worker. Can't be pickled
+    into `Battle` pool workers.
+    """
+
+    def __init__(self, model: DotsBoxModel, deadline: float | None = None) -> None:
+        self.model = model
+        self.deadline = deadline
+        self.seconds = 0.0
+        self.pending = False
+        self.started = 0.0
+        self.seed: int | None = None  # last `reseed`, resent to a restarted worker
+        self.shm = SharedMemory(create=True, size=BOARD_BYTES)
+        self._spawn()
+
+    @property
+    def name(self) -> str:
+        return self.model.__class__.__name__
+
+    @property
+    def PONDER(self) -> bool:
+        return self.model.PONDER
+
+    @PONDER.setter
+    def PONDER(self, on: bool) -> None:
+        # kept on `model` too, so a restarted worker still has it
+        self.model.PONDER = on
+        self.conn.send(("ponder", on))
+
+    def _spawn(self) -> None:
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(child, self.model, self.shm.name), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def _restart(self) -> None:
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+        self.pending = False
+        self._spawn()
+        if self.seed is not None:
+            # a fresh worker must not fall back to an unseeded `random`
+            self.conn.send(("seed", self.seed))
+
+    def submit(
+        self, board_lines: "list[list[list[int]]] | BoardView", xsize: int, ysize: int
+    ) -> None:
+        """Start the worker on a move; the answer comes from `collect`."""
+        bits = get_geometry(xsize, ysize).pack(board_lines)
+        self.shm.buf[:BOARD_BYTES] = bits.to_bytes(BOARD_BYTES, "little")
+        self.conn.send(("run", xsize, ysize))
+        self.pending = True
+        self.started = time.perf_counter()
+
+    def remaining(self) -> float | None:
+        """Seconds left for the submitted move (None: no deadline)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.started + self.deadline - time.perf_counter())
+
+    def collect(self) -> list[int]:
+        """The submitted move, waiting at most until the deadline."""
+        if not self.conn.poll(self.remaining()):
+            self._restart()
+            raise MoveTimeout(f"{self.name} took over {self.deadline}s")
+        move, self.stats, self.seconds = self.conn.recv()
+        self.pending = False
+        return move
+
+    def run(
+        self, board_lines: list[list[list[int]]], xsize: int, ysize: int
+    ) -> list[int]:
+        self.submit(board_lines, xsize, ysize)
+        return self.collect()
+
+    def reseed(self, seed: int) -> None:
+        """Seed the worker's `random` (it doesn't share the referee's)."""
+        self.seed = seed
+        self.conn.send(("seed", seed))
+
+    def stop_pondering(self) -> None:
+        self.conn.send(("unponder",))
+
+    def on_game_start(self, player: int, xsize: int, ysize: int) -> None:
+        self.conn.send(("start", player, xsize, ysize))
+
+    def on_move(self, player: int, move: list[int], completed: int) -> None:
+        self.conn.send(("move", player, list(move), completed))
+
+    def close(self) -> None:
+        if self.process.is_alive():
+            if self.pending:
+                self.process.terminate()
+            else:
+                self.conn.send(("stop",))
+            self.process.join()
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "RemoteModel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,188 @@
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from models.bitboard import BoardGeometry, get_geometry
+
+# column file -> dtype; per-game columns first, then per-move columns
+GAME_COLUMNS = {
+    "initial_turn": np.uint8,
+    "winner": np.int8,
+    "flag": np.uint8,
+    "score": np.uint8,  # 2 per game
+    "n_moves": np.uint16,
+}
+MOVE_COLUMNS = {
+    "moves": np.uint8,  # edge index, see models.bitboard
+    "players": np.uint8,
+    "times": np.float32,
+    "nodes": np.uint32,  # search nodes reported in the model's `stats`
+}
+
+
+class EncodedResult(NamedTuple):
+    """One game in column form; cheap to pickle back from a worker."""
+
+    initial_turn: int
+    winner: int
+    flag: int
+    score: tuple[int, int]
+    moves: np.ndarray
+    players: np.ndarray
+    times: np.ndarray
+    nodes: np.ndarray
+
+
+def encode_result(result, initial_turn: int, geo: BoardGeometry) -> EncodedResult:
+    """`BattleResult` -> `EncodedResult`."""
+    return EncodedResult(
+        initial_turn=initial_turn,
+        winner=result.winner,
+        flag=result.flag,
+        score=tuple(result.score),
+        moves=np.array([geo.edge_of(m) for _, m in result.actions], dtype=np.uint8),
+        players=np.array([p for p, _ in result.actions], dtype=np.uint8),
+        times=np.array([t for _, t in result.time_taken], dtype=np.float32),
+        nodes=np.array(
+            [stats.get("nodes", 0) for _, stats in result.move_stats]
+            if result.move_stats
+            else np.zeros(len(result.actions)),
+            dtype=np.uint32,
+        ),
+    )
+
+
+class ResultWriter:
+    """Appends games to a column-per-file results directory.
+
+    Games are buffered and written every `chunk_games` games (and on
+    `close()`), so memory stays flat however many games are played.
+    Re-opening an existing directory appends to it.
+    """
+
+    def __init__(
+        self, path: str, xsize: int = 5, ysize: int = 5, chunk_games: int = 1024
+    ) -> None:
+        self.path = path
+        self.geo = get_geometry(xsize, ysize)
+        self.chunk_games = chunk_games
+        self._pending: list[EncodedResult] = []
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        meta = {"xsize": xsize, "ysize": ysize}
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                if json.load(f) != meta:
+                    raise ValueError(f"{path} holds results for another board size")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add(self, result, initial_turn: int) -> None:
+        self.add_encoded(encode_result(result, initial_turn, self.geo))
+
+    def add_encoded(self, encoded: EncodedResult) -> None:
+        self._pending.append(encoded)
+        if len(self._pending) >= self.chunk_games:
+            self.flush()
+
+    def add_batch(self, batch) -> None:
+        """Add a `Battle.batch()`-shaped `[side][index]` list."""
+        for initial_turn, results in enumerate(batch):
+            for result in results:
+                self.add(result, initial_turn)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        pending = self._pending
+        columns = {
+            "initial_turn": [g.initial_turn for g in pending],
+            "winner": [g.winner for g in pending],
+            "flag": [g.flag for g in pending],
+            "score": [s for g in pending for s in g.score],
+            "n_moves": [len(g.moves) for g in pending],
+        }
+        for name, dtype in GAME_COLUMNS.items():
+            self._append(name, np.array(columns[name], dtype=dtype))
+        for name, dtype in MOVE_COLUMNS.items():
+            self._append(
+                name, np.concatenate([getattr(g, name) for g in pending]).astype(dtype)
+            )
+        self._pending = []
+
+    def _append(self, name: str, values: np.ndarray) -> None:
+        with open(os.path.join(self.path, name), "ab") as f:
+            f.write(values.tobytes())
+
+    def close(self) -> None:
+        self.flush()
+
+
+class ResultStore:
+    """Memory-mapped, read-only view of a results directory.
+
+    Per-game arrays: `initial_turn`, `winner`, `flag`, `score` (n, 2),
+    `n_moves`. Per-move arrays: `moves`, `players`, `times`, `nodes`; game
+    `i` owns `offsets[i]:offsets[i + 1]` of them.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.geo = get_geometry(meta["xsize"], meta["ysize"])
+        for name, dtype in {**GAME_COLUMNS, **MOVE_COLUMNS}.items():
+            setattr(self, name, self._map(name, dtype))
+        self.score = self.score.reshape(-1, 2)
+        self.offsets = np.zeros(len(self.n_moves) + 1, dtype=np.int64)
+        np.cumsum(self.n_moves, out=self.offsets[1:])
+
+    def _map(self, name: str, dtype) -> np.ndarray:
+        file = os.path.join(self.path, name)
+        if not os.path.exists(file) or os.path.getsize(file) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file, dtype=dtype, mode="r")
+
+    def __len__(self) -> int:
+        return len(self.winner)
+
+    def game(self, i: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(moves, players, times) of game `i`."""
+        s = slice(self.offsets[i], self.offsets[i + 1])
+        return self.moves[s], self.players[s], self.times[s]
+
+
+def calculate_winrate(store: ResultStore) -> tuple[float, float]:
+    """Same numbers as the notebook's `calculate_winrate` on a batch."""
+    total_games = len(store)
+    if total_games == 0:
+        return 0.0, 0.0
+    return (
+        float(np.count_nonzero(store.winner == 0)) / total_games,
+        float(np.count_nonzero(store.winner == 1)) / total_games,
+    )
+
+
+def calculate_times(
+    store: ResultStore,
+) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """Per-game move times of each player, games with player 0 starting
+    first (the notebook's `calculate_times` ordering)."""
+    order = np.argsort(store.initial_turn, kind="stable")
+    times_p0: list[np.ndarray] = []
+    times_p1: list[np.ndarray] = []
+    for i in order:
+        _, players, times = store.game(i)
+        times_p0.append(times[players == 0])
+        times_p1.append(times[players == 1])
+    return times_p0, times_p1
@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+
+# one pairing: (player i, player j, wins of i, wins of j, draws)
+Pairing = tuple[int, int, int, int, int]
+
+
+def bradley_terry(
+    n_players: int, pairings: list[Pairing], prior: float = 0.5, iters: int = 500
+) -> list[float]:
+    """Bradley-Terry ratings on the Elo scale (mean 0), fitted by MM.
+
+    Draws count as half a win each. `prior` adds `2 * prior` virtual
+    draws to every pairing (`prior` points to each side; one draw with
+    the default) so an unbeaten or winless player stays finite.
+    """
+    wins = [0.0] * n_players
+    games: dict[tuple[int, int], float] = {}
+    for i, j, wi, wj, d in pairings:
+        wins[i] += wi + 0.5 * d + prior
+        wins[j] += wj + 0.5 * d + prior
+        games[(i, j)] = games.get((i, j), 0.0) + wi + wj + d + 2 * prior
+
+    strength = [1.0] * n_players
+    for _ in range(iters):
+        denom = [0.0] * n_players
+        for (i, j), n in games.items():
+            share = n / (strength[i] + strength[j])
+            denom[i] += share
+            denom[j] += share
+        new = [w / d if d > 0 else 1.0 for w, d in zip(wins, denom)]
+        mean_log = sum(math.log(s) for s in new) / n_players
+        new = [s / math.exp(mean_log) for s in new]
+        done = max(abs(a - b) for a, b in zip(new, strength)) < 1e-10
+        strength = new
+        if done:
+            break
+    return [400.0 * math.log10(s) for s in strength]
+
+
+def bootstrap_intervals(
+    n_players: int,
+    pairings: list[Pairing],
+    samples: int = 200,
+    level: float = 0.95,
+    seed: int = 0,
+) -> list[tuple[float, float]]:
+    """Percentile bootstrap intervals for `bradley_terry`, resampling each
+    pairing's games from its observed win/loss/draw frequencies."""
+    rng = np.random.default_rng(seed)
+    ratings = np.empty((samples, n_players))
+    for s in range(samples):
+        resampled = []
+        for i, j, wi, wj, d in pairings:
+            n = wi + wj + d
+            if n == 0:
+                continue
+            ri, rj, rd = rng.multinomial(n, [wi / n, wj / n, d / n])
+            resampled.append((i, j, int(ri), int(rj), int(rd)))
+        ratings[s] = bradley_terry(n_players, resampled)
+    tail = (1.0 - level) / 2 * 100
+    lo = np.percentile(ratings, tail, axis=0)
+    hi = np.percentile(ratings, 100 - tail, axis=0)
+    return [(float(a), float(b)) for a, b in zip(lo, hi)]
+
+
+def elo_to_score(elo: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def sprt_bounds(alpha: float, beta: float) -> tuple[float, float]:
+    """(lower, upper) log-likelihood-ratio bounds: accept H0 at or below
+    the lower one, H1 at or above the upper one."""
+    return math.log(beta / (1.0 - alpha)), math.log((1.0 - beta) / alpha)
+
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """Log-likelihood ratio of H1 (Elo `elo1`) against H0 (Elo `elo0`).
+
+    Uses the normal approximation of the per-game score (win 1, draw 1/2,
+    loss 0), as in the usual chess-engine GSPRT. Half a virtual game is
+    added to each outcome so a perfect record still has some variance.
+    """
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0
+    w, d, l = wins + 0.5, draws + 0.5, losses + 0.5
+    total = w + d + l
+    score = (w + 0.5 * d) / total
+    var = (w + 0.25 * d) / total - score * score
+    s0, s1 = elo_to_score(elo0), elo_to_score(elo1)
+    return n * (s1 - s0) * (2.0 * score - s0 - s1) / (2.0 * var)
+
+
+def mean_and_stderr(values: list[float]) -> tuple[float, float]:
+    """Sample mean and its standard error (0 with fewer than 2 values)."""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0
+    mean = sum(values) / n
+    if n < 2:
+        return mean, 0.0
+    var = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return mean, math.sqrt(var / n)
@@ -0,0 +1,68 @@
+from battle import Battle
+from models.NimberH import NimberH
+from models.V4b import V4b
+
+
+def outcomes(results):
+    # search counters are compared too: state leaking in from an earlier
+    # game shows up in them (e.g. tt_hits) before it changes a move.
+    # nim_shapes counts misses of the nimstring memo, which holds exact
+    # values and is meant to be shared between games.
+    return [
+        [
+            (
+                r.winner,
+                r.actions,
+                r.score,
+                r.flag,
+                r.seed,
+                [
+                    (p, {k: v for k, v in s.items() if k != "nim_shapes"})
+                    for p, s in r.move_stats
+                ],
+            )
+            for r in side
+        ]
+        for side in results
+    ]
+
+
+def test_seeded_batch_does_not_depend_on_workers():
+    # solve_edges=0: the negamax phase has to run for search state to leak
+    battle = Battle(V4b(solve_edges=0), NimberH())
+    battle.BATCH_SIZE = 6
+    sequential = battle.batch(workers=1, seed=7)
+    pooled = battle.batch(workers=4, seed=7)
+    assert outcomes(sequential) == outcomes(pooled)
+
+
+class Recorder(V4b):
+    """V4b that logs the calls `Battle` makes to it."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def on_game_start(self, player, xsize, ysize):
+        super().on_game_start(player, xsize, ysize)
+        self.calls.append(("start", player))
+
+    def on_move(self, player, move, completed):
+        super().on_move(player, move, completed)
+        self.calls.append(("move", player, tuple(move), completed))
+
+    def run(self, board_lines, xsize, ysize):
+        self.calls.append(("run", type(board_lines).__name__))
+        return super().run(board_lines, xsize, ysize)
+
+
+def test_start_follows_the_battle_protocol(capsys):
+    players = [Recorder(), Recorder()]
+    Battle(*players).start()
+    capsys.readouterr()
+    for i, player in enumerate(players):
+        assert player.calls[0] == ("start", i)
+        assert {c[1] for c in player.calls if c[0] == "run"} == {"BoardView"}
+    moves = [c for c in players[0].calls if c[0] == "move"]
+    assert moves == [c for c in players[1].calls if c[0] == "move"]
+    assert sum(c[3] for c in moves) == 25
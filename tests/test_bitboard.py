@@ -0,0 +1,21 @@
+import random
+
+from models.bitboard import BoardView, get_geometry
+
+
+def test_board_view_reads_like_the_nested_list():
+    geo = get_geometry(5, 5)
+    rng = random.Random(0)
+    for _ in range(50):
+        bits = rng.getrandbits(geo.num_edges)
+        board = geo.unpack(bits)
+        view = BoardView(geo, bits)
+        assert len(view) == len(board)
+        assert [[list(r) for r in row] for row in view] == board
+        assert all(
+            view[x][y][z] == board[x][y][z]
+            for x in range(len(board))
+            for y in range(len(board[x]))
+            for z in (0, 1)
+        )
+        assert geo.pack(view) == bits
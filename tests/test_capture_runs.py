@@ -0,0 +1,85 @@
+import random
+
+from models.bitboard import get_geometry
+from models.search import NegamaxSearch
+from models.solver import EndgameSolver
+
+
+def brute_force(geo, bits, memo):
+    """Net boxes for the player to move, trying every edge in turn (no
+    macro moves, no pruning)."""
+    if bits == geo.full_mask:
+        return 0
+    value = memo.get(bits)
+    if value is None:
+        value = -geo.num_boxes
+        for e in geo.empty_edges(bits):
+            completed = geo.completed_by(bits, e)
+            child = brute_force(geo, bits | (1 << e), memo)
+            value = max(value, completed + child if completed else -child)
+        memo[bits] = value
+    return value
+
+
+def sample_positions(geo, n, empty, seed):
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(n):
+        drawn = rng.sample(range(geo.num_edges), geo.num_edges - empty)
+        positions.append(sum(1 << e for e in drawn))
+    return positions
+
+
+def test_solver_matches_brute_force_on_every_2x2_position():
+    geo = get_geometry(2, 2)
+    memo = {}
+    solver = EndgameSolver(geo)
+    for bits in range(1 << geo.num_edges):
+        assert solver.value(bits) == brute_force(geo, bits, memo), hex(bits)
+
+
+def test_solver_matches_brute_force_on_3x3_positions():
+    geo = get_geometry(3, 3)
+    memo = {}
+    solver = EndgameSolver(geo)
+    for bits in sample_positions(geo, 60, 11, seed=1):
+        assert solver.value(bits) == brute_force(geo, bits, memo), hex(bits)
+
+
+def test_macro_moves_match_plain_search():
+    # searched to the end, compressed capture runs (double-dealing
+    # included) must give the same root value as plain negamax
+    geo = get_geometry(3, 3)
+    memo = {}
+    for bits in sample_positions(geo, 60, 9, seed=2):
+        moves = geo.empty_edges(bits)
+        depth = len(moves)
+        exact = max(
+            (
+                geo.completed_by(bits, e) + brute_force(geo, bits | (1 << e), memo)
+                if geo.completed_by(bits, e)
+                else -brute_force(geo, bits | (1 << e), memo)
+            )
+            for e in moves
+        )
+        for compress in (True, False):
+            search = NegamaxSearch(geo, 10, compress_captures=compress)
+            _, value = search.search(bits, moves, depth)
+            assert value == exact, (hex(bits), compress)
+
+
+def test_double_dealing_is_offered_at_the_end_of_a_chain():
+    # 3x1 board: a 3-chain between the left and right rims, opened at its
+    # left end, so all three boxes can be taken
+    geo = get_geometry(3, 1)
+    opened = geo.edge_index[0][0][1]
+    open_lines = [geo.edge_index[x][0][1] for x in range(1, 4)]
+    bits = geo.full_mask & ~sum(1 << e for e in open_lines)
+    assert bits >> opened & 1
+    runs = geo.capture_runs(bits)
+    # the first box is always taken; then take the rest, or decline by
+    # drawing the far rim and handing the last 2 boxes over
+    assert sorted((taken, keep) for _, taken, keep in runs) == [(1, False), (2, True)]
+    decline = next(child for child, _, keep in runs if not keep)
+    assert decline >> open_lines[-1] & 1
+    assert EndgameSolver(geo).value(bits) == brute_force(geo, bits, {}) == 3
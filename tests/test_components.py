@@ -0,0 +1,58 @@
+import random
+
+from models.bitboard import get_geometry
+from models.components import ComponentTracker
+
+
+def brute_nim_sum(board, xsize, ysize):
+    """The chain/loop nim-sum as Nimber/NimberH computed it before
+    `ComponentTracker`: a flood fill over the nested-list board."""
+
+    def sides(x, y):
+        return board[x][y][0] + board[x][y + 1][0] + board[x][y][1] + board[x + 1][y][1]
+
+    def joined(x, y):
+        # 2-sided neighbours reached through a drawn shared side
+        if y > 0 and board[x][y][0]:
+            yield x, y - 1
+        if y < ysize - 1 and board[x][y + 1][0]:
+            yield x, y + 1
+        if x > 0 and board[x][y][1]:
+            yield x - 1, y
+        if x < xsize - 1 and board[x + 1][y][1]:
+            yield x + 1, y
+
+    seen = set()
+    nim_sum = 0
+    for x in range(xsize):
+        for y in range(ysize):
+            if sides(x, y) != 2 or (x, y) in seen:
+                continue
+            component = [(x, y)]
+            seen.add((x, y))
+            for cx, cy in component:
+                for n in joined(cx, cy):
+                    if n not in seen and sides(*n) == 2:
+                        seen.add(n)
+                        component.append(n)
+            is_chain = any(
+                0 <= nx < xsize and 0 <= ny < ysize and sides(nx, ny) == 3
+                for cx, cy in component
+                for nx, ny in ((cx, cy - 1), (cx, cy + 1), (cx - 1, cy), (cx + 1, cy))
+            )
+            nim_sum ^= len(component) if is_chain else 1
+    return nim_sum
+
+
+def test_nim_sum_matches_a_full_board_flood_fill():
+    rng = random.Random(0)
+    for xsize, ysize in [(5, 5), (4, 3)]:
+        geo = get_geometry(xsize, ysize)
+        for _ in range(100):
+            density = rng.uniform(0.3, 0.8)
+            bits = sum(1 << e for e in range(geo.num_edges) if rng.random() < density)
+            tracker = ComponentTracker(geo, bits)
+            assert tracker.nim_sum == brute_nim_sum(geo.unpack(bits), xsize, ysize)
+            for e in geo.empty_edges(bits):
+                after = brute_nim_sum(geo.unpack(bits | 1 << e), xsize, ysize)
+                assert tracker.nim_sum_after(e) == after
@@ -0,0 +1,58 @@
+from models.bitboard import get_geometry
+from models.endgame import EndgameTable, opening_edge, simple_components
+
+from test_capture_runs import brute_force
+
+
+def simple_endgames(geo, max_open):
+    """Every position whose unfinished boxes all have exactly 2 sides,
+    with at most `max_open` lines left: the open lines form independent
+    chains and loops."""
+    last_edge = [max(edges) for edges in geo.box_edges]
+    counts = [0] * geo.num_boxes
+    out = []
+
+    def visit(e, open_lines):
+        if open_lines.bit_count() > max_open:
+            return
+        if e == geo.num_edges:
+            out.append(geo.full_mask & ~open_lines)
+            return
+        for take in (0, 1):
+            boxes = geo.edge_boxes[e]
+            if take and any(counts[b] == 2 for b in boxes):
+                continue
+            for b in boxes:
+                counts[b] += take
+            if all(counts[b] in (0, 2) for b in boxes if last_edge[b] == e):
+                visit(e + 1, open_lines | take << e)
+            for b in boxes:
+                counts[b] -= take
+
+    visit(0, 0)
+    return out
+
+
+def test_table_matches_brute_force_on_simple_3x3_endgames():
+    geo = get_geometry(3, 3)
+    table = EndgameTable.load("data/endgame.bin")
+    assert table is not None
+    memo = {}
+    positions = simple_endgames(geo, 10)
+    assert len(positions) > 1000
+    for bits in positions:
+        components = simple_components(geo, bits)
+        assert components is not None
+        chains = tuple(sorted(len(c) for c, is_loop in components if not is_loop))
+        loops = tuple(sorted(len(c) for c, is_loop in components if is_loop))
+        exact = brute_force(geo, bits, memo)
+        assert table.value(chains, loops) == exact, hex(bits)
+
+        best = table.best_opening(chains, loops)
+        if best is None:
+            continue
+        # the line NimberH draws for the table's choice is worth as much
+        n, is_loop, _ = best
+        boxes = next(c for c, l in components if l == is_loop and len(c) == n)
+        edge = opening_edge(geo, bits, boxes, is_loop)
+        assert -brute_force(geo, bits | (1 << edge), memo) == exact, hex(bits)
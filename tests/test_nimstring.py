@@ -0,0 +1,76 @@
+import random
+
+from models.bitboard import get_geometry
+from models.nimstring import NimstringEvaluator
+
+
+def mover_wins(geo, bits, memo):
+    """Nimstring by brute force: completing a box means moving again, and
+    a player with no line left to draw loses."""
+    if bits == geo.full_mask:
+        return False
+    wins = memo.get(bits)
+    if wins is None:
+        wins = False
+        for e in geo.empty_edges(bits):
+            child = mover_wins(geo, bits | (1 << e), memo)
+            if child if geo.completed_by(bits, e) else not child:
+                wins = True
+                break
+        memo[bits] = wins
+    return wins
+
+
+def strip(*chains):
+    """A 1 x 8 strip holding the given chains (first, last box) and
+    nothing else: a chain is open at the top of its first and last box
+    (top and bottom for a single box) and between its boxes."""
+    geo = get_geometry(8, 1)
+    open_lines = 0
+    for first, last in chains:
+        open_lines |= 1 << geo.edge_index[first][0][0]
+        open_lines |= 1 << geo.edge_index[last][1 if first == last else 0][0]
+        for x in range(first + 1, last + 1):
+            open_lines |= 1 << geo.edge_index[x][0][1]
+    return geo, geo.full_mask & ~open_lines
+
+
+def test_known_values():
+    # a short chain (1 or 2 boxes) is a nim heap of 1; opening a long
+    # chain or a loop is loony, so they are worth 0
+    cases = [
+        ([(0, 0)], 1),
+        ([(0, 1)], 1),
+        ([(0, 2)], 0),
+        ([(0, 4)], 0),
+        ([(0, 0), (2, 2)], 0),
+        ([(0, 1), (3, 4)], 0),
+        ([(0, 0), (2, 4)], 1),
+        ([(0, 1), (3, 3), (5, 7)], 0),
+    ]
+    for chains, value in cases:
+        geo, bits = strip(*chains)
+        assert not any((bits & m).bit_count() == 3 for m in geo.box_mask)
+        assert NimstringEvaluator(geo).value(bits) == value, chains
+    # a 4-box loop: a 2x2 board with only its rim drawn
+    geo = get_geometry(2, 2)
+    rim = sum(1 << e for e, boxes in enumerate(geo.edge_boxes) if len(boxes) == 1)
+    assert NimstringEvaluator(geo).value(rim) == 0
+
+
+def test_zero_values_are_lost_positions():
+    for (xsize, ysize), samples in (((2, 2), None), ((3, 2), 300)):
+        geo = get_geometry(xsize, ysize)
+        evaluator = NimstringEvaluator(geo)
+        memo = {}
+        if samples is None:
+            positions = range(1 << geo.num_edges)
+        else:
+            rng = random.Random(3)
+            positions = [rng.getrandbits(geo.num_edges) for _ in range(samples)]
+        for bits in positions:
+            if any((bits & m).bit_count() == 3 for m in geo.box_mask):
+                continue  # `value` is for positions with no box to take
+            value = evaluator.value(bits)
+            assert value is not None
+            assert (value != 0) == mover_wins(geo, bits, memo), hex(bits)
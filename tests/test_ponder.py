@@ -0,0 +1,29 @@
+from models.V4b import V4b
+from models.bitboard import get_geometry
+from models.search import NegamaxSearch
+
+# 29 empty edges, one safe move left: V4b searches it with its defaults
+LATE = 0x74307C3EB2EA565
+
+
+def test_default_v4b_searches_between_solver_and_greedy():
+    model = V4b()
+    model.run(get_geometry(5, 5).unpack(LATE), 5, 5)
+    assert model.stats["phase"] == "negamax"
+    assert model._search_moves(LATE) is not None
+
+
+def test_ponderer_fills_the_table_with_fresh_search_results():
+    geo = get_geometry(5, 5)
+    model = V4b(ponder=True)
+    model.run(geo.unpack(LATE), 5, 5)
+    ponderer = model.ponderer
+    assert ponderer is not None and ponderer.thread is not None
+    ponderer.thread.join()  # let it ponder every reply
+
+    assert ponderer.pondered > 0
+    assert any(slot is not None for slot in model.search.tt.slots)
+    for child, move in ponderer.results.items():
+        moves = model._search_moves(child)
+        fresh, _ = NegamaxSearch(geo).search(child, moves, model.SEARCH_DEPTH)
+        assert move == fresh
@@ -0,0 +1,19 @@
+import pytest
+
+from battle import Battle
+from models.V4b import V4b
+from profiling import ModelProfiler
+
+
+def test_profiles_are_kept_per_seat():
+    profiler = ModelProfiler()
+    battle = Battle(V4b(solve_edges=0), V4b(), hooks=[profiler])
+    battle.battle(0, seed=1)
+    assert sorted(profiler.samples) == ["player0-V4b", "player1-V4b"]
+
+
+def test_hooks_are_refused_with_a_pool():
+    battle = Battle(V4b(), V4b(), hooks=[ModelProfiler()])
+    battle.BATCH_SIZE = 1
+    with pytest.raises(ValueError):
+        battle.batch(workers=2, seed=1)
@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+
+from battle import Battle
+from models.Randomix import Randomix
+from referee import VectorReferee
+
+N_GAMES = 64
+
+
+def scripted_games(geo, rng):
+    """Per game: a starting side and an edge order (edge `num_edges` is off
+    the board); about a third of the games forfeit by repeating a drawn
+    edge or playing off the board at a random ply."""
+    games = []
+    for _ in range(N_GAMES):
+        edges = list(range(geo.num_edges))
+        rng.shuffle(edges)
+        if rng.random() < 0.35:
+            ply = rng.randrange(1, geo.num_edges)
+            bad = rng.choice([edges[rng.randrange(ply)], geo.num_edges])
+            edges.insert(ply, bad)
+        games.append((rng.randrange(2), edges))
+    return games
+
+
+def replay(battle, initial_turn, edges):
+    """One game on the scalar referee, as `Battle.battle` scores it."""
+    battle.reset(initial_turn)
+    plies = 0
+    for edge in edges:
+        if battle.is_over():
+            break
+        move = battle.geo.move_of(edge) if edge < battle.geo.num_edges else [99, 0, 0]
+        completed = battle.try_move(move)
+        if completed == -1:
+            return 1 - battle.turn, 1, tuple(battle.score), plies
+        battle.score[battle.turn] += completed
+        plies += 1
+        if completed == 0:
+            battle.turn = 1 - battle.turn
+    return battle.winner(), 0, tuple(battle.score), plies
+
+
+def test_vector_referee_matches_scalar_replay():
+    battle = Battle(Randomix(), Randomix())
+    geo = battle.geo
+    games = scripted_games(geo, random.Random(0))
+
+    referee = VectorReferee(N_GAMES, battle.xsize, battle.ysize)
+    referee.reset(np.array([turn for turn, _ in games]))
+    step = 0
+    while not referee.over.all():
+        moves = np.array(
+            [edges[step] if step < len(edges) else -1 for _, edges in games]
+        )
+        moves[referee.over] = -1
+        referee.apply(moves)
+        step += 1
+
+    expected = [replay(battle, turn, edges) for turn, edges in games]
+    assert any(flag for _, flag, _, _ in expected)
+    assert referee.winners().tolist() == [w for w, _, _, _ in expected]
+    assert referee.flag.tolist() == [f for _, f, _, _ in expected]
+    assert [tuple(s) for s in referee.score.tolist()] == [s for _, _, s, _ in expected]
+    assert referee.plies.tolist() == [p for _, _, _, p in expected]
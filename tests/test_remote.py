@@ -0,0 +1,51 @@
+import random
+import time
+
+import pytest
+
+from battle import Battle
+from models.DotsBoxModel import DotsBoxModel
+from models.NimberH import NimberH
+from models.V4b import V4b
+from models.bitboard import get_geometry
+from remote import MoveTimeout, RemoteModel
+
+
+class Dice(DotsBoxModel):
+    """Stalls on boards with edge 0 drawn; otherwise reports a draw from
+    the worker's `random`."""
+
+    def run(self, board_lines, xsize, ysize):
+        if get_geometry(xsize, ysize).pack(board_lines) & 1:
+            time.sleep(10)
+        self.stats = {"draw": random.random()}
+        return [0, 0, 0]
+
+
+def test_restarted_worker_is_reseeded():
+    geo = get_geometry(5, 5)
+    with RemoteModel(Dice(), deadline=0.5) as remote:
+        remote.reseed(42)
+        with pytest.raises(MoveTimeout):
+            remote.run(geo.unpack(1), 5, 5)
+        remote.run(geo.unpack(0), 5, 5)
+        assert remote.stats["draw"] == random.Random(42).random()
+
+
+def test_ponder_flag_reaches_the_worker():
+    # 29 empty edges: V4b searches, then ponders the replies to its move
+    late = 0x74307C3EB2EA565
+    geo = get_geometry(5, 5)
+    local = V4b(ponder=True)
+    edge = geo.edge_of(local.run(geo.unpack(late), 5, 5))
+    local.ponderer.thread.join()
+    reply = next(iter(local.ponderer.results))
+
+    with pytest.raises(ValueError):
+        Battle(V4b(), NimberH(), ponder=(True, False))
+    with RemoteModel(V4b()) as remote:
+        Battle(remote, NimberH(), ponder=(True, False))
+        assert geo.edge_of(remote.run(geo.unpack(late), 5, 5)) == edge
+        time.sleep(1.0)  # a local ponder takes about 0.05s
+        remote.run(geo.unpack(reply), 5, 5)
+        assert remote.stats["phase"] == "ponder"
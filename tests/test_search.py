@@ -0,0 +1,27 @@
+import time
+
+from models.bitboard import get_geometry
+from models.search import NegamaxSearch, SearchTimeout
+
+
+def test_search_until_ignores_failed_aspiration_on_timeout():
+    # depth 1 finishes at 10; depth 2 fails high on its aspiration window
+    # and the full-window re-search times out
+    search = NegamaxSearch(get_geometry(2, 2))
+    calls = []
+
+    def search_root(bits, h, moves, depth, alpha=-float("inf"), beta=float("inf")):
+        calls.append((depth, alpha, beta))
+        if depth == 1:
+            return moves[0], 10.0
+        if alpha > -float("inf"):
+            return moves[1], 500.0  # only a lower bound
+        raise SearchTimeout
+
+    search._search_root = search_root
+    moves = [3, 5, 7]
+    best = search.search_until(0, moves, time.perf_counter() + 60)
+
+    assert best == (3, 10.0)
+    assert search.depth_reached == 1
+    assert [c[0] for c in calls] == [1, 2, 2]
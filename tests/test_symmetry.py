@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from models.bitboard import get_geometry
+from models.symmetry import Symmetry, get_symmetry
+
+
+def permute(bits, perm):
+    return sum(1 << perm[e] for e in range(len(perm)) if bits >> e & 1)
+
+
+@pytest.mark.parametrize("xsize, ysize, count", [(5, 5, 8), (5, 4, 4), (3, 2, 4)])
+def test_transforms_are_board_automorphisms(xsize, ysize, count):
+    geo = get_geometry(xsize, ysize)
+    symmetry = Symmetry(geo)
+    assert symmetry.num_transforms == count
+    assert symmetry.perms[0] == list(range(geo.num_edges))
+    boxes = set(geo.box_mask)
+    for t, perm in enumerate(symmetry.perms):
+        assert sorted(perm) == list(range(geo.num_edges))
+        # an edge permutation that maps boxes to boxes is a board symmetry
+        assert {permute(m, perm) for m in geo.box_mask} == boxes
+        inverse = symmetry.perms[symmetry.inverse[t]]
+        assert [inverse[e] for e in perm] == list(range(geo.num_edges))
+    assert len({tuple(perm) for perm in symmetry.perms}) == count
+
+
+@pytest.mark.parametrize("xsize, ysize", [(5, 5), (5, 4)])
+def test_canonical_round_trip(xsize, ysize):
+    geo = get_geometry(xsize, ysize)
+    symmetry = get_symmetry(xsize, ysize)
+    rng = random.Random(0)
+    for _ in range(200):
+        bits = rng.getrandbits(geo.num_edges)
+        canonical, t = symmetry.canonical(bits)
+        images = [permute(bits, perm) for perm in symmetry.perms]
+        assert images == [symmetry.transform(bits, u) for u in range(len(images))]
+        assert canonical == min(images) == images[t]
+        # every image of the board has the same canonical form
+        assert {symmetry.canonical(image)[0] for image in images} == {canonical}
+        for e in range(geo.num_edges):
+            c = symmetry.to_canonical(e, t)
+            assert symmetry.from_canonical(c, t) == e
+            assert canonical >> c & 1 == bits >> e & 1
+            if not bits >> e & 1:
+                assert geo.completed_by(canonical, c) == geo.completed_by(bits, e)
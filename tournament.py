@@ -0,0 +1,185 @@
+#! /usr/bin/env python
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import glob
+import hashlib
+import importlib
+import inspect
+import itertools
+import json
+import os.path
+
+from battle import Battle, derive_seed
+from dist import _collect_modules
+from models.DotsBoxModel import DotsBoxModel
+from stats import Pairing, bootstrap_intervals, bradley_terry
+
+
+@dataclass(frozen=True)
+class Entry:
+    """One tournament player: a model class plus constructor kwargs."""
+
+    module: str
+    cls: str
+    kwargs: tuple[tuple[str, object], ...] = ()
+
+    @property
+    def name(self) -> str:
+        if not self.kwargs:
+            return self.cls
+        args = ", ".join(f"{k}={v!r}" for k, v in self.kwargs)
+        return f"{self.cls}({args})"
+
+    def build(self) -> DotsBoxModel:
+        module = importlib.import_module(f"models.{self.module}")
+        return getattr(module, self.cls)(**dict(self.kwargs))
+
+
+def discover(only: list[str] | None = None) -> list[Entry]:
+    """Every `DotsBoxModel` subclass defined in `models/*.py`.
+
+    A class can list parameterized variants in a `VARIANTS` attribute (a
+    list of constructor kwargs); otherwise it plays with its defaults.
+    """
+    entries = []
+    for path in sorted(glob.glob("./models/*.py")):
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        module = importlib.import_module(f"models.{module_name}")
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if (
+                cls is DotsBoxModel
+                or not issubclass(cls, DotsBoxModel)
+                or cls.__module__ != module.__name__
+            ):
+                continue
+            if only and cls_name not in only:
+                continue
+            for kwargs in getattr(cls, "VARIANTS", [{}]):
+                entries.append(Entry(module_name, cls_name, tuple(sorted(kwargs.items()))))
+    return entries
+
+
+def source_hash(module: str) -> str:
+    """Hash of a model's source and every `models.*` module it inlines."""
+    digest = hashlib.sha256()
+    for name in _collect_modules(module):
+        with open(f"./models/{name}.py", "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+# pool workers keep one Battle per pairing
+_worker_battles: dict[tuple[Entry, Entry], Battle] = {}
+
+
+def _play(task: tuple[Entry, Entry, int, int]) -> int:
+    a, b, initial_turn, seed = task
+    battle = _worker_battles.get((a, b))
+    if battle is None:
+        battle = Battle(a.build(), b.build())
+        _worker_battles[(a, b)] = battle
+    return battle.battle(initial_turn, seed).winner
+
+
+def _load(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(path: str, cache: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1)
+    os.replace(tmp, path)
+
+
+def play_round_robin(
+    entries: list[Entry], games: int, workers: int, seed: int, cache_path: str
+) -> dict:
+    """Play every pairing that isn't cached yet, `games` per starting side.
+
+    A cached pairing is reused while both models' source hashes match and
+    it has at least as many games. Results are saved as each pairing
+    finishes, so an interrupted run resumes where it stopped.
+    """
+    cache = _load(cache_path)
+    hashes = {e: source_hash(e.module) for e in entries}
+
+    todo = []
+    for a, b in itertools.combinations(entries, 2):
+        record = cache.get(f"{a.name} vs {b.name}")
+        if (
+            record is not None
+            and record["hashes"] == [hashes[a], hashes[b]]
+            and record["games"] >= 2 * games
+        ):
+            continue
+        todo.append((a, b))
+    print(f"{len(todo)} of {len(entries) * (len(entries) - 1) // 2} pairings to play")
+
+    tasks = [
+        (a, b, _initial_turn, derive_seed(seed, f"{a.name} vs {b.name}", _initial_turn, i))
+        for a, b in todo
+        for _initial_turn in [0, 1]
+        for i in range(games)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(tasks) // (workers * 8))
+        counts = [0, 0, 0]  # wins a, wins b, draws
+        played = 0
+        for (a, b, _, _), winner in zip(tasks, pool.map(_play, tasks, chunksize=chunksize)):
+            counts[winner if winner >= 0 else 2] += 1
+            played += 1
+            if played == 2 * games:
+                key = f"{a.name} vs {b.name}"
+                cache[key] = {
+                    "a": a.name,
+                    "b": b.name,
+                    "hashes": [hashes[a], hashes[b]],
+                    "games": played,
+                    "wins": counts[:2],
+                    "draws": counts[2],
+                }
+                _save(cache_path, cache)
+                print(f"{key}: {counts[0]}-{counts[1]} ({counts[2]} draws)")
+                counts = [0, 0, 0]
+                played = 0
+    return cache
+
+
+def rate(entries: list[Entry], cache: dict, samples: int = 200) -> list[tuple[str, float, float, float]]:
+    """(name, Elo, CI low, CI high) for `entries`, best first."""
+    index = {e.name: i for i, e in enumerate(entries)}
+    pairings: list[Pairing] = []
+    for record in cache.values():
+        if record["a"] in index and record["b"] in index:
+            pairings.append(
+                (index[record["a"]], index[record["b"]], *record["wins"], record["draws"])
+            )
+    ratings = bradley_terry(len(entries), pairings)
+    intervals = bootstrap_intervals(len(entries), pairings, samples)
+    table = [
+        (e.name, r, lo, hi) for e, r, (lo, hi) in zip(entries, ratings, intervals)
+    ]
+    return sorted(table, key=lambda row: -row[1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Round-robin tournament over every model in models/"
+    )
+    parser.add_argument("models", nargs="*", help="class names to include (default: all)")
+    parser.add_argument("--games", type=int, default=40, help="games per starting side")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", default="tournament.json")
+    args = parser.parse_args()
+
+    entries = discover(args.models or None)
+    cache = play_round_robin(entries, args.games, args.workers, args.seed, args.cache)
+    print(f"{'model':<40} {'Elo':>7}   95% CI")
+    for name, rating, lo, hi in rate(entries, cache):
+        print(f"{name:<40} {rating:7.1f}   [{lo:.0f}, {hi:.0f}]")